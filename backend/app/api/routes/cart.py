@@ -1,11 +1,15 @@
 """Cart API routes."""
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import case, literal, literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
 from app.api.deps import get_current_user
-from app.core.exceptions import OutOfStockError, CartNotFoundError
+from app.core.exceptions import CartConflictError, OutOfStockError, CartNotFoundError
 from app.database import get_db
 from app.models.cart import Cart
 from app.models.cart_item import CartItem
@@ -13,35 +17,366 @@ from app.models.saved_item import SavedItem
 from app.models.product import Product
 from app.models.user import User
 from app.schemas.cart import (
+    CartBatchRequest,
     CartItemCreate,
     CartItemUpdate,
     CartResponse,
     GuestCartMerge,
 )
 
-router = APIRouter(prefix="/cart", tags=["cart"])
 
+def keep_loaded_state(db: Session = Depends(get_db)) -> None:
+    """
+    Stop the request's session from expiring objects on commit.
+
+    Cart routes mutate the loaded cart and return it after commit; without
+    this, serializing the response would reload every object.
+
+    Args:
+        db: Database session
+    """
+    db.expire_on_commit = False
+
+
+router = APIRouter(prefix="/cart", tags=["cart"], dependencies=[Depends(keep_loaded_state)])
+
+
+def empty_cart(user: User) -> CartResponse:
+    """
+    Build the response for a user who has no cart row yet.
+
+    Carts are created by the first request that writes to them, so reads
+    never write. The placeholder has id 0.
+
+    Args:
+        user: Current user
 
-def get_or_create_cart(db: Session, user: User) -> Cart:
+    Returns:
+        Empty cart
     """
-    Get user's cart or create one if it doesn't exist.
+    now = datetime.utcnow()
+    return CartResponse(id=0, user_id=user.id, items=[], saved_items=[], created_at=now, updated_at=now)
+
+
+def load_cart(db: Session, user: User) -> Optional[Cart]:
+    """
+    Get user's cart with items, saved items and their products.
+
+    Each collection is loaded with its own SELECT ... IN query, so the result
+    has one row per line instead of the items x saved_items rows of a joined
+    load. Routes mutate the cart through its collections and return it after
+    commit without reloading (see keep_loaded_state).
 
     Args:
         db: Database session
         user: Current user
 
     Returns:
-        User's cart
+        User's cart with relationships loaded, or None if the user has no cart
     """
-    cart = db.query(Cart).filter(Cart.user_id == user.id).first()
+    # populate_existing picks up rows written with bulk statements
+    return db.query(Cart)\
+        .filter(Cart.user_id == user.id)\
+        .populate_existing()\
+        .options(
+            selectinload(Cart.items).joinedload(CartItem.product),
+            selectinload(Cart.saved_items).joinedload(SavedItem.product)
+        )\
+        .first()
 
-    if not cart:
-        cart = Cart(user_id=user.id)
-        db.add(cart)
-        db.commit()
-        db.refresh(cart)
 
-    return cart
+def upsert_insert(db: Session, model):
+    """
+    Build an INSERT that supports ON CONFLICT clauses.
+
+    Args:
+        db: Database session
+        model: Mapped class to insert into
+
+    Returns:
+        PostgreSQL or SQLite Insert construct for the session's database
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model.__table__)
+    return sqlite.insert(model.__table__)
+
+
+def ensure_cart(db: Session, user: User) -> None:
+    """
+    Create the user's cart row unless it exists, without failing if a
+    concurrent request creates it first.
+
+    Args:
+        db: Database session
+        user: Current user
+    """
+    now = datetime.utcnow()
+    db.execute(
+        upsert_insert(db, Cart)
+        .values(user_id=user.id, created_at=now, updated_at=now)
+        .on_conflict_do_nothing(index_elements=[Cart.user_id])
+    )
+
+
+def get_cart_id(db: Session, user: User) -> int:
+    """
+    Return the id of the user's cart, creating the cart if needed.
+
+    Only called by requests that are about to write to the cart, so the row
+    is created in the same transaction as the first change.
+
+    Args:
+        db: Database session
+        user: Current user
+
+    Returns:
+        Cart ID
+    """
+    cart_id = db.query(Cart.id).filter(Cart.user_id == user.id).scalar()
+    if cart_id is None:
+        ensure_cart(db, user)
+        cart_id = db.query(Cart.id).filter(Cart.user_id == user.id).scalar()
+    return cart_id
+
+
+def upsert_cart_item(db: Session, user: User, product_id: int, quantity: int) -> bool:
+    """
+    Add quantity to the user's line for a product in one statement.
+
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE inserts the line or adds to
+    the existing one, and both branches only write if the resulting quantity
+    is within the product's stock. The database applies the whole check and
+    write atomically, so concurrent adds neither lose updates nor fail on
+    the (cart_id, product_id) unique constraint.
+
+    Args:
+        db: Database session
+        user: Current user
+        product_id: Product to add
+        quantity: Quantity to add
+
+    Returns:
+        Whether the line was written; False if the user has no cart, the
+        product doesn't exist or stock is insufficient
+    """
+    now = datetime.utcnow()
+    insert = upsert_insert(db, CartItem)
+
+    current_stock = select(Product.stock)\
+        .where(Product.id == product_id)\
+        .scalar_subquery()
+    merged = CartItem.__table__.c.quantity + insert.excluded.quantity
+
+    # The WHERE clause also avoids SQLite's INSERT ... SELECT upsert parsing ambiguity
+    rows = select(Cart.id, Product.id, literal(quantity), literal(now), literal(now))\
+        .join(Product, Product.id == product_id)\
+        .where(Cart.user_id == user.id, Product.stock >= quantity)
+
+    statement = insert\
+        .from_select(["cart_id", "product_id", "quantity", "created_at", "updated_at"], rows)\
+        .on_conflict_do_update(
+            index_elements=[CartItem.cart_id, CartItem.product_id],
+            set_={"quantity": merged, "updated_at": insert.excluded.updated_at},
+            where=merged <= current_stock,
+        )\
+        .returning(CartItem.__table__.c.id)
+
+    return db.execute(statement).first() is not None
+
+
+def add_to_cart_error(db: Session, user: User, product_id: int) -> OutOfStockError:
+    """
+    Explain why upsert_cart_item wrote nothing for an existing cart.
+
+    Args:
+        db: Database session
+        user: Current user
+        product_id: Product that was added
+
+    Returns:
+        Error to raise
+    """
+    product = db.get(Product, product_id)
+    if not product:
+        return OutOfStockError("Product not found")
+
+    existing_quantity = db.query(CartItem.quantity)\
+        .join(Cart)\
+        .filter(Cart.user_id == user.id, CartItem.product_id == product_id)\
+        .scalar()
+    if existing_quantity is not None:
+        return OutOfStockError(
+            f"Only {product.stock} units available. You already have {existing_quantity} in your cart."
+        )
+    return OutOfStockError(f"Only {product.stock} units available")
+
+
+def find_cart_item(cart: Cart, item_id: int) -> CartItem:
+    """
+    Find a line in a loaded cart.
+
+    Args:
+        cart: Cart from load_cart
+        item_id: Cart item ID
+
+    Returns:
+        Cart item
+
+    Raises:
+        CartNotFoundError: If the cart has no such item
+    """
+    for cart_item in cart.items:
+        if cart_item.id == item_id:
+            return cart_item
+    raise CartNotFoundError("Cart item not found")
+
+
+def find_saved_item(cart: Cart, saved_id: int) -> SavedItem:
+    """
+    Find a saved-for-later item in a loaded cart.
+
+    Args:
+        cart: Cart from load_cart
+        saved_id: Saved item ID
+
+    Returns:
+        Saved item
+
+    Raises:
+        CartNotFoundError: If the cart has no such saved item
+    """
+    for saved_item in cart.saved_items:
+        if saved_item.id == saved_id:
+            return saved_item
+    raise CartNotFoundError("Saved item not found")
+
+
+def find_by_product(items: list, product_id: int):
+    """Return the item for product_id in a loaded cart collection, or None."""
+    return next((item for item in items if item.product_id == product_id), None)
+
+
+def add_item(cart: Cart, product: Product, quantity: int) -> None:
+    """
+    Add a product to a loaded cart, or increment its quantity if already there.
+
+    Args:
+        cart: Cart from load_cart
+        product: Product to add
+        quantity: Quantity to add
+
+    Raises:
+        OutOfStockError: If the resulting quantity exceeds available stock
+    """
+    existing_item = find_by_product(cart.items, product.id)
+
+    if existing_item:
+        # Increment quantity
+        new_quantity = existing_item.quantity + quantity
+        if new_quantity > product.stock:
+            raise OutOfStockError(
+                f"Only {product.stock} units available. You already have {existing_item.quantity} in your cart."
+            )
+        existing_item.quantity = new_quantity
+    else:
+        # Check stock availability
+        if quantity > product.stock:
+            raise OutOfStockError(f"Only {product.stock} units available")
+
+        cart.items.append(CartItem(product=product, quantity=quantity))
+
+
+def update_item(cart: Cart, item_id: int, quantity: int) -> None:
+    """
+    Set the quantity of a cart line.
+
+    Args:
+        cart: Cart from load_cart
+        item_id: Cart item ID
+        quantity: New quantity
+
+    Raises:
+        CartNotFoundError: If the cart has no such item
+        OutOfStockError: If quantity exceeds available stock
+    """
+    cart_item = find_cart_item(cart, item_id)
+
+    product = cart_item.product
+    if quantity > product.stock:
+        raise OutOfStockError(f"Only {product.stock} units available")
+
+    cart_item.quantity = quantity
+
+
+def remove_item(cart: Cart, item_id: int) -> None:
+    """
+    Remove a cart line.
+
+    Args:
+        cart: Cart from load_cart
+        item_id: Cart item ID
+
+    Raises:
+        CartNotFoundError: If the cart has no such item
+    """
+    # Removing from the collection deletes the row (delete-orphan)
+    cart.items.remove(find_cart_item(cart, item_id))
+
+
+def save_item(cart: Cart, item_id: int) -> None:
+    """
+    Move a cart line to saved for later.
+
+    Args:
+        cart: Cart from load_cart
+        item_id: Cart item ID
+
+    Raises:
+        CartNotFoundError: If the cart has no such item
+    """
+    cart_item = find_cart_item(cart, item_id)
+
+    # Check if already saved
+    existing_saved = find_by_product(cart.saved_items, cart_item.product_id)
+
+    if existing_saved:
+        existing_saved.quantity = cart_item.quantity
+    else:
+        cart.saved_items.append(SavedItem(product=cart_item.product, quantity=cart_item.quantity))
+
+    cart.items.remove(cart_item)
+
+
+def restore_item(cart: Cart, saved_id: int) -> None:
+    """
+    Move a saved item back to the cart, adding to any quantity already there.
+
+    Args:
+        cart: Cart from load_cart
+        saved_id: Saved item ID
+
+    Raises:
+        CartNotFoundError: If the cart has no such saved item
+        OutOfStockError: If the resulting quantity exceeds available stock
+    """
+    saved_item = find_saved_item(cart, saved_id)
+
+    # Check stock availability
+    product = saved_item.product
+    if saved_item.quantity > product.stock:
+        raise OutOfStockError(f"Only {product.stock} units available")
+
+    existing_item = find_by_product(cart.items, saved_item.product_id)
+
+    if existing_item:
+        new_quantity = existing_item.quantity + saved_item.quantity
+        if new_quantity > product.stock:
+            raise OutOfStockError(f"Only {product.stock} units available")
+        existing_item.quantity = new_quantity
+    else:
+        cart.items.append(CartItem(product=product, quantity=saved_item.quantity))
+
+    cart.saved_items.remove(saved_item)
 
 
 @router.get("", response_model=CartResponse)
@@ -57,20 +392,9 @@ def get_cart(
         db: Database session
 
     Returns:
-        User's cart with items and saved items
+        User's cart with items and saved items (empty if it was never created)
     """
-    cart = get_or_create_cart(db, current_user)
-
-    # Eagerly load relationships
-    cart = db.query(Cart)\
-        .filter(Cart.id == cart.id)\
-        .options(
-            joinedload(Cart.items).joinedload(CartItem.product),
-            joinedload(Cart.saved_items).joinedload(SavedItem.product)
-        )\
-        .first()
-
-    return cart
+    return load_cart(db, current_user) or empty_cart(current_user)
 
 
 @router.post("/items", response_model=CartResponse, status_code=status.HTTP_201_CREATED)
@@ -91,54 +415,21 @@ def add_to_cart(
         Updated cart
 
     Raises:
-        OutOfStockError: If requested quantity exceeds available stock
+        OutOfStockError: If product doesn't exist or requested quantity exceeds available stock
     """
-    # Get or create cart
-    cart = get_or_create_cart(db, current_user)
+    written = upsert_cart_item(db, current_user, item_data.product_id, item_data.quantity)
 
-    # Check if product exists and has sufficient stock
-    product = db.query(Product).filter(Product.id == item_data.product_id).first()
-    if not product:
-        raise OutOfStockError("Product not found")
-
-    # Check if item already exists in cart
-    existing_item = db.query(CartItem)\
-        .filter(CartItem.cart_id == cart.id, CartItem.product_id == item_data.product_id)\
-        .first()
-
-    if existing_item:
-        # Increment quantity
-        new_quantity = existing_item.quantity + item_data.quantity
-        if new_quantity > product.stock:
-            raise OutOfStockError(
-                f"Only {product.stock} units available. You already have {existing_item.quantity} in your cart."
-            )
-        existing_item.quantity = new_quantity
-    else:
-        # Check stock availability
-        if item_data.quantity > product.stock:
-            raise OutOfStockError(f"Only {product.stock} units available")
+    if not written and not db.query(Cart.id).filter(Cart.user_id == current_user.id).first():
+        # First write for this user: create the cart in this transaction and try again
+        ensure_cart(db, current_user)
+        written = upsert_cart_item(db, current_user, item_data.product_id, item_data.quantity)
 
-        # Create new cart item
-        new_item = CartItem(
-            cart_id=cart.id,
-            product_id=item_data.product_id,
-            quantity=item_data.quantity
-        )
-        db.add(new_item)
+    if not written:
+        raise add_to_cart_error(db, current_user, item_data.product_id)
 
     db.commit()
 
-    # Return updated cart with eager loading
-    cart = db.query(Cart)\
-        .filter(Cart.id == cart.id)\
-        .options(
-            joinedload(Cart.items).joinedload(CartItem.product),
-            joinedload(Cart.saved_items).joinedload(SavedItem.product)
-        )\
-        .first()
-
-    return cart
+    return load_cart(db, current_user)
 
 
 @router.put("/items/{item_id}", response_model=CartResponse)
@@ -165,34 +456,13 @@ def update_cart_item(
         CartNotFoundError: If cart item not found
     """
     # Get user's cart
-    cart = get_or_create_cart(db, current_user)
-
-    # Find cart item
-    cart_item = db.query(CartItem)\
-        .filter(CartItem.id == item_id, CartItem.cart_id == cart.id)\
-        .first()
-
-    if not cart_item:
+    cart = load_cart(db, current_user)
+    if not cart:
         raise CartNotFoundError("Cart item not found")
 
-    # Check stock availability
-    product = db.query(Product).filter(Product.id == cart_item.product_id).first()
-    if item_data.quantity > product.stock:
-        raise OutOfStockError(f"Only {product.stock} units available")
-
-    # Update quantity
-    cart_item.quantity = item_data.quantity
+    update_item(cart, item_id, item_data.quantity)
     db.commit()
 
-    # Return updated cart
-    cart = db.query(Cart)\
-        .filter(Cart.id == cart.id)\
-        .options(
-            joinedload(Cart.items).joinedload(CartItem.product),
-            joinedload(Cart.saved_items).joinedload(SavedItem.product)
-        )\
-        .first()
-
     return cart
 
 
@@ -217,28 +487,13 @@ def remove_cart_item(
         CartNotFoundError: If cart item not found
     """
     # Get user's cart
-    cart = get_or_create_cart(db, current_user)
-
-    # Find and delete cart item
-    cart_item = db.query(CartItem)\
-        .filter(CartItem.id == item_id, CartItem.cart_id == cart.id)\
-        .first()
-
-    if not cart_item:
+    cart = load_cart(db, current_user)
+    if not cart:
         raise CartNotFoundError("Cart item not found")
 
-    db.delete(cart_item)
+    remove_item(cart, item_id)
     db.commit()
 
-    # Return updated cart
-    cart = db.query(Cart)\
-        .filter(Cart.id == cart.id)\
-        .options(
-            joinedload(Cart.items).joinedload(CartItem.product),
-            joinedload(Cart.saved_items).joinedload(SavedItem.product)
-        )\
-        .first()
-
     return cart
 
 
@@ -250,7 +505,11 @@ def merge_guest_cart(
 ):
     """
     Merge guest cart with user's cart on login.
-    Combines quantities for duplicate products.
+    Combines quantities for duplicate products, capped at available stock.
+
+    The merge is one product query and one INSERT ... ON CONFLICT DO UPDATE
+    for the whole guest cart, so its cost doesn't grow with the number of
+    guest items. Unknown and sold-out products are skipped.
 
     Args:
         guest_cart_data: Guest cart items from localStorage
@@ -259,60 +518,53 @@ def merge_guest_cart(
 
     Returns:
         Merged cart
-
-    Raises:
-        OutOfStockError: If merged quantity exceeds available stock
     """
-    # Get or create cart
-    cart = get_or_create_cart(db, current_user)
-
-    # Merge each guest cart item
+    # One row per product: an upsert can't touch the same line twice
+    requested: dict[int, int] = {}
     for guest_item in guest_cart_data.items:
-        # Check if product exists and has sufficient stock
-        product = db.query(Product).filter(Product.id == guest_item.product_id).first()
-        if not product:
-            continue  # Skip invalid products
-
-        # Check if item already exists in cart
-        existing_item = db.query(CartItem)\
-            .filter(CartItem.cart_id == cart.id, CartItem.product_id == guest_item.product_id)\
-            .first()
-
-        if existing_item:
-            # Combine quantities
-            new_quantity = existing_item.quantity + guest_item.quantity
-            if new_quantity > product.stock:
-                # Cap at available stock
-                existing_item.quantity = product.stock
-            else:
-                existing_item.quantity = new_quantity
-        else:
-            # Add new item
-            if guest_item.quantity > product.stock:
-                # Cap at available stock
-                quantity = product.stock
-            else:
-                quantity = guest_item.quantity
-
-            new_item = CartItem(
-                cart_id=cart.id,
-                product_id=guest_item.product_id,
-                quantity=quantity
-            )
-            db.add(new_item)
+        requested[guest_item.product_id] = requested.get(guest_item.product_id, 0) + guest_item.quantity
+
+    stock = dict(
+        db.query(Product.id, Product.stock)
+        .filter(Product.id.in_(requested), Product.stock > 0)
+    )
+
+    if stock:
+        # Existing lines: combine quantities, capped at current stock
+        insert = upsert_insert(db, CartItem)
+        # SQLAlchemy doesn't correlate subqueries inside ON CONFLICT, so
+        # insert.excluded would add "cart_items AS excluded" to the FROM list
+        # (a cross join); name the proposed row's column directly instead
+        current_stock = select(Product.stock)\
+            .where(Product.id == literal_column("excluded.product_id"))\
+            .scalar_subquery()
+        merged = CartItem.__table__.c.quantity + insert.excluded.quantity
+        upsert = insert.on_conflict_do_update(
+            index_elements=[CartItem.cart_id, CartItem.product_id],
+            set_={
+                "quantity": case((merged > current_stock, current_stock), else_=merged),
+                "updated_at": insert.excluded.updated_at,
+            },
+        )
 
-    db.commit()
+        cart_id = get_cart_id(db, current_user)
+        now = datetime.utcnow()
+
+        # One executemany; rows are passed as parameters so the statement stays cached
+        db.execute(upsert, [
+            {
+                "cart_id": cart_id,
+                "product_id": product_id,
+                "quantity": min(requested[product_id], available),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for product_id, available in stock.items()
+        ])
 
-    # Return merged cart
-    cart = db.query(Cart)\
-        .filter(Cart.id == cart.id)\
-        .options(
-            joinedload(Cart.items).joinedload(CartItem.product),
-            joinedload(Cart.saved_items).joinedload(SavedItem.product)
-        )\
-        .first()
+        db.commit()
 
-    return cart
+    return load_cart(db, current_user) or empty_cart(current_user)
 
 
 @router.post("/items/{item_id}/save", response_model=CartResponse)
@@ -336,46 +588,13 @@ def save_for_later(
         CartNotFoundError: If cart item not found
     """
     # Get user's cart
-    cart = get_or_create_cart(db, current_user)
-
-    # Find cart item
-    cart_item = db.query(CartItem)\
-        .filter(CartItem.id == item_id, CartItem.cart_id == cart.id)\
-        .first()
-
-    if not cart_item:
+    cart = load_cart(db, current_user)
+    if not cart:
         raise CartNotFoundError("Cart item not found")
 
-    # Check if already saved
-    existing_saved = db.query(SavedItem)\
-        .filter(SavedItem.cart_id == cart.id, SavedItem.product_id == cart_item.product_id)\
-        .first()
-
-    if existing_saved:
-        # Update quantity
-        existing_saved.quantity = cart_item.quantity
-    else:
-        # Create saved item
-        saved_item = SavedItem(
-            cart_id=cart.id,
-            product_id=cart_item.product_id,
-            quantity=cart_item.quantity
-        )
-        db.add(saved_item)
-
-    # Remove from cart
-    db.delete(cart_item)
+    save_item(cart, item_id)
     db.commit()
 
-    # Return updated cart
-    cart = db.query(Cart)\
-        .filter(Cart.id == cart.id)\
-        .options(
-            joinedload(Cart.items).joinedload(CartItem.product),
-            joinedload(Cart.saved_items).joinedload(SavedItem.product)
-        )\
-        .first()
-
     return cart
 
 
@@ -401,54 +620,13 @@ def restore_saved_item(
         OutOfStockError: If product is out of stock
     """
     # Get user's cart
-    cart = get_or_create_cart(db, current_user)
-
-    # Find saved item
-    saved_item = db.query(SavedItem)\
-        .filter(SavedItem.id == saved_id, SavedItem.cart_id == cart.id)\
-        .first()
-
-    if not saved_item:
+    cart = load_cart(db, current_user)
+    if not cart:
         raise CartNotFoundError("Saved item not found")
 
-    # Check stock availability
-    product = db.query(Product).filter(Product.id == saved_item.product_id).first()
-    if saved_item.quantity > product.stock:
-        raise OutOfStockError(f"Only {product.stock} units available")
-
-    # Check if already in cart
-    existing_item = db.query(CartItem)\
-        .filter(CartItem.cart_id == cart.id, CartItem.product_id == saved_item.product_id)\
-        .first()
-
-    if existing_item:
-        # Add to existing quantity
-        new_quantity = existing_item.quantity + saved_item.quantity
-        if new_quantity > product.stock:
-            raise OutOfStockError(f"Only {product.stock} units available")
-        existing_item.quantity = new_quantity
-    else:
-        # Create cart item
-        cart_item = CartItem(
-            cart_id=cart.id,
-            product_id=saved_item.product_id,
-            quantity=saved_item.quantity
-        )
-        db.add(cart_item)
-
-    # Remove from saved
-    db.delete(saved_item)
+    restore_item(cart, saved_id)
     db.commit()
 
-    # Return updated cart
-    cart = db.query(Cart)\
-        .filter(Cart.id == cart.id)\
-        .options(
-            joinedload(Cart.items).joinedload(CartItem.product),
-            joinedload(Cart.saved_items).joinedload(SavedItem.product)
-        )\
-        .first()
-
     return cart
 
 
@@ -473,27 +651,89 @@ def remove_saved_item(
         CartNotFoundError: If saved item not found
     """
     # Get user's cart
-    cart = get_or_create_cart(db, current_user)
-
-    # Find and delete saved item
-    saved_item = db.query(SavedItem)\
-        .filter(SavedItem.id == saved_id, SavedItem.cart_id == cart.id)\
-        .first()
-
-    if not saved_item:
+    cart = load_cart(db, current_user)
+    if not cart:
         raise CartNotFoundError("Saved item not found")
 
-    db.delete(saved_item)
+    cart.saved_items.remove(find_saved_item(cart, saved_id))
     db.commit()
 
-    # Return updated cart
-    cart = db.query(Cart)\
-        .filter(Cart.id == cart.id)\
-        .options(
-            joinedload(Cart.items).joinedload(CartItem.product),
-            joinedload(Cart.saved_items).joinedload(SavedItem.product)
-        )\
-        .first()
+    return cart
+
+
+@router.post("/batch", response_model=CartResponse)
+def batch_update_cart(
+    batch: CartBatchRequest,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Session = Depends(get_db)
+):
+    """
+    Apply several cart operations in one transaction.
+
+    Operations run in order with the same rules as the single-operation
+    endpoints. Products added that aren't already in the cart are read with
+    one query up front. If any operation fails, nothing is applied.
+
+    Args:
+        batch: Ordered add/update/remove/save/restore operations
+        current_user: Authenticated user
+        db: Database session
+
+    Returns:
+        Updated cart
+
+    Raises:
+        OutOfStockError: If an operation exceeds available stock or adds an unknown product
+        CartNotFoundError: If an operation references an item not in the cart
+        CartConflictError: If a concurrent request added the same product first
+    """
+    cart = load_cart(db, current_user)
+    if not cart:
+        ensure_cart(db, current_user)
+        cart = load_cart(db, current_user)
+
+    # Products in the cart and saved list are already loaded; fetch the rest at once
+    products = {line.product_id: line.product for line in [*cart.items, *cart.saved_items]}
+    new_ids = {
+        operation.product_id for operation in batch.operations
+        if operation.op == "add" and operation.product_id not in products
+    }
+    if new_ids:
+        products.update(
+            (product.id, product)
+            for product in db.query(Product).filter(Product.id.in_(new_ids))
+        )
+
+    for index, operation in enumerate(batch.operations, start=1):
+        try:
+            if operation.op == "add":
+                product = products.get(operation.product_id)
+                if not product:
+                    raise OutOfStockError("Product not found")
+                add_item(cart, product, operation.quantity)
+            elif operation.op == "update":
+                update_item(cart, operation.item_id, operation.quantity)
+            elif operation.op == "remove":
+                remove_item(cart, operation.item_id)
+            elif operation.op == "save":
+                save_item(cart, operation.item_id)
+            else:
+                restore_item(cart, operation.saved_id)
+        except (OutOfStockError, CartNotFoundError) as exc:
+            raise type(exc)(f"Operation {index} ({operation.op}): {exc.detail}") from exc
+
+        # Write each step before the next: a line removed and re-added in the
+        # same batch must be deleted before it is inserted again
+        try:
+            db.flush()
+        except IntegrityError as exc:
+            # Another request inserted this line after the cart was loaded
+            db.rollback()
+            raise CartConflictError(
+                f"Operation {index} ({operation.op}): cart was changed by another request, please retry"
+            ) from exc
+
+    db.commit()
 
     return cart
 
@@ -510,11 +750,11 @@ def clear_cart(
         current_user: Authenticated user
         db: Database session
     """
-    # Get user's cart
-    cart = get_or_create_cart(db, current_user)
+    cart_id = db.query(Cart.id).filter(Cart.user_id == current_user.id).scalar()
 
-    # Delete all cart items
-    db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
-    db.commit()
+    # Nothing to clear if the cart was never created
+    if cart_id is not None:
+        db.query(CartItem).filter(CartItem.cart_id == cart_id).delete()
+        db.commit()
 
     return None
@@ -1,28 +1,172 @@
 """Product API routes."""
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Annotated, Literal, Optional
 from math import ceil
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session, load_only
 
-from app.database import get_db
-from app.models.product import Product
-from app.schemas.product import ProductResponse, ProductListResponse
+from app.config import settings
+from app.core.catalog import VOLATILE_COLUMNS, get_catalog_version, get_static_catalog_version
+from app.core.change_feed import stream_changes
+from app.core.http_cache import body_etag, json_response
+from app.core.pagination import apply_keyset, encode_cursor
+from app.core.product_cache import (
+    cache_stats,
+    count_cache,
+    detail_cache,
+    detail_flight,
+    encode_listing,
+    encode_response,
+    facet_cache,
+    facet_flight,
+    listing_cache,
+    listing_flight,
+    load_static_product,
+    render_listing,
+    render_product,
+)
+from app.core.product_ids import product_ids
+from app.core.ranked_search import ranked_index
+from app.core.search import apply_search
+from app.core.snapshot import SNAPSHOT_SORT_FIELDS, get_snapshot, snapshot_enabled
+from app.core.suggest import suggest_index
+from app.database import SessionLocal, get_db
+from app.models.product import Product, ProductCategory
+from app.schemas.product import (
+    CategoryFacet,
+    PriceBucketFacet,
+    ProductBatchRequest,
+    ProductBatchResponse,
+    ProductFacetsResponse,
+    ProductFieldsListResponse,
+    ProductFieldsResponse,
+    ProductListResponse,
+    ProductResponse,
+    ProductSuggestResponse,
+)
 
 router = APIRouter(prefix="/products", tags=["products"])
 
 
+def count_products(query, filter_key: tuple, mode: str) -> tuple[Optional[int], bool]:
+    """
+    Count the products matched by a filtered listing query.
+
+    Args:
+        query: Filtered Product query (before sorting and pagination)
+        filter_key: (static catalog version, category, search, min_price, max_price) tuple
+        mode: exact, estimate or none
+
+    Returns:
+        Tuple of (total or None, whether the total is an estimate). An
+        estimated total is a lower bound capped at PRODUCT_COUNT_ESTIMATE_CAP.
+    """
+    if mode == "none":
+        return None, False
+
+    total = count_cache.get(filter_key)
+    if total is not None:
+        return total, False
+
+    if mode == "estimate":
+        # Stop counting after the cap so huge result sets stay cheap
+        cap = settings.PRODUCT_COUNT_ESTIMATE_CAP
+        total = query.limit(cap + 1).count()
+        if total > cap:
+            return cap, True
+    else:
+        total = query.count()
+
+    count_cache.set(filter_key, total)
+    return total, False
+
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """
+    Parse a sparse fieldset parameter.
+
+    Args:
+        fields: Comma-separated ProductResponse field names
+
+    Returns:
+        Requested fields in schema order, or None for full products
+
+    Raises:
+        HTTPException: If a field name is unknown
+    """
+    requested = {name.strip() for name in (fields or "").split(",") if name.strip()}
+    if not requested:
+        return None
+
+    unknown = requested - ProductResponse.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown product fields: {', '.join(sorted(unknown))}"
+        )
+    return tuple(name for name in ProductResponse.model_fields if name in requested)
+
+
+def listing_response(products: list, fields: Optional[tuple[str, ...]], **metadata) -> ProductListResponse:
+    """
+    Wrap listing rows in the full or sparse list schema.
+
+    Args:
+        products: Product rows (only the requested columns need to be loaded)
+        fields: Sparse fieldset, or None for full products
+        **metadata: Pagination fields of ProductListResponse
+
+    Returns:
+        ProductListResponse, or ProductFieldsListResponse for a sparse fieldset
+    """
+    if fields is None:
+        return ProductListResponse(products=products, **metadata)
+
+    return ProductFieldsListResponse(
+        products=[
+            ProductFieldsResponse(**{name: getattr(product, name) for name in fields})
+            for product in products
+        ],
+        **metadata,
+    )
+
+
 @router.get("", response_model=ProductListResponse)
 def get_products(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(12, ge=1, le=100, description="Items per page"),
     category: Optional[str] = Query(None, description="Filter by category"),
     search: Optional[str] = Query(None, description="Search in name and description"),
-    sort_by: str = Query("created_at", description="Sort by field (price, name, created_at)"),
+    sort_by: Optional[str] = Query(
+        None,
+        description="Sort by field (relevance, price, name, created_at). "
+                    "Defaults to relevance when searching, otherwise created_at",
+    ),
     sort_order: str = Query("desc", description="Sort order (asc, desc)"),
     min_price: Optional[float] = Query(None, ge=0, description="Minimum price filter"),
     max_price: Optional[float] = Query(None, ge=0, description="Maximum price filter"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination cursor. Pass an empty value for the first page, "
+                    "then the next_cursor of the previous response. Skips the total count",
+    ),
+    count: Literal["exact", "estimate", "none"] = Query(
+        "exact", description="Total count mode (exact, estimate, none)"
+    ),
+    search_mode: Literal["fulltext", "ranked"] = Query(
+        "fulltext",
+        description="Search engine: fulltext (database index) or ranked "
+                    "(typo-tolerant BM25, ordered by score)",
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated product fields to return (e.g. id,name,price,image_url). "
+                    "Defaults to all fields",
+    ),
+    if_none_match: Annotated[str | None, Header()] = None,
     db: Session = Depends(get_db),
 ):
     """
@@ -33,85 +177,604 @@ def get_products(
         page_size: Number of items per page
         category: Filter by category
         search: Search query for name and description
-        sort_by: Field to sort by (price, name, created_at)
+        sort_by: Field to sort by (relevance, price, name, created_at)
         sort_order: Sort order (asc, desc)
         min_price: Minimum price filter
         max_price: Maximum price filter
+        cursor: Keyset pagination cursor (enables cursor mode when present)
+        count: How to compute the total (exact, estimate, none)
+        search_mode: Search engine to use (fulltext, ranked)
+        fields: Sparse fieldset (comma-separated product field names)
+        if_none_match: ETag of the client's cached copy, if any
         db: Database session
 
     Returns:
-        Paginated product list with metadata
+        Paginated product list with metadata (304 if the client's copy is current)
+
+    Raises:
+        HTTPException: If the cursor is invalid, the sort doesn't support cursors,
+            cursors are combined with ranked search, or a field is unknown
+    """
+    # Normalize parameters so equivalent requests share a cache entry
+    category = category or None
+    search = search.strip().lower() if search else None
+    sort_order = "asc" if sort_order.lower() == "asc" else "desc"
+    fields = parse_fields(fields)
+
+    version = get_static_catalog_version()
+    # Sparse listings carry stock in the cached body instead of merging it at
+    # response time, so they are keyed by the full catalog version
+    listing_version = version
+    if fields is not None and not set(VOLATILE_COLUMNS).isdisjoint(fields):
+        listing_version = get_catalog_version()
+
+    cache_key = (
+        listing_version, page, page_size, category, search, sort_by, sort_order,
+        min_price, max_price, cursor, count, search_mode, fields,
+    )
+
+    def load_listing():
+        if (
+            snapshot_enabled()
+            and fields is None
+            and search is None
+            and cursor is None
+            and (sort_by or "created_at") in SNAPSHOT_SORT_FIELDS
+        ):
+            # Plain filter/sort listings are served from the catalog snapshot
+            listing = get_snapshot(db).list_products(
+                page=page,
+                page_size=page_size,
+                category=category,
+                min_price=min_price,
+                max_price=max_price,
+                sort_by=sort_by or "created_at",
+                sort_order=sort_order,
+                count=count,
+            )
+        else:
+            listing = encode_listing(query_products(
+                db,
+                version=version,
+                page=page,
+                page_size=page_size,
+                category=category,
+                search=search,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                min_price=min_price,
+                max_price=max_price,
+                cursor=cursor,
+                count=count,
+                search_mode=search_mode,
+                fields=fields,
+            ))
+        listing_cache.set(cache_key, listing)
+        return listing
+
+    cached = listing_cache.get(cache_key)
+    if cached is None:
+        # Concurrent identical misses wait for one query instead of each running it
+        cached = listing_flight.do(cache_key, load_listing)
+
+    # Pre-encoded bodies (plus current stock): skip response validation
+    etag, body = render_listing(db, cached)
+    return json_response(body, etag, if_none_match)
+
+
+def query_products(
+    db: Session,
+    *,
+    version: int,
+    page: int,
+    page_size: int,
+    category: Optional[str],
+    search: Optional[str],
+    sort_by: Optional[str],
+    sort_order: str,
+    min_price: Optional[float],
+    max_price: Optional[float],
+    cursor: Optional[str],
+    count: str,
+    search_mode: str = "fulltext",
+    fields: Optional[tuple[str, ...]] = None,
+) -> ProductListResponse:
     """
-    # Start with base query
+    Run a product listing against the database.
+
+    Args:
+        db: Database session
+        version: Static catalog version captured before reading
+        (remaining arguments as normalized by get_products)
+
+    Returns:
+        Paginated product list with metadata (sparse when fields is given)
+
+    Raises:
+        HTTPException: If the cursor is invalid, the sort doesn't support cursors,
+            or cursors are combined with ranked search
+    """
+    if search and search_mode == "ranked":
+        if cursor is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is not supported with ranked search"
+            )
+        return ranked_products(
+            db,
+            page=page,
+            page_size=page_size,
+            category=category,
+            search=search,
+            min_price=min_price,
+            max_price=max_price,
+            count=count,
+            fields=fields,
+        )
+
+    # Start with base query, loading only the requested columns (plus the
+    # cursor sort key) for sparse fieldsets
     query = db.query(Product)
+    if fields is not None:
+        columns = set(fields) | {"id", sort_by or "created_at"}
+        query = query.options(load_only(*[getattr(Product, name) for name in columns if hasattr(Product, name)]))
 
     # Apply category filter
     if category:
         query = query.filter(Product.category == category)
 
-    # Apply search filter
+    # Apply search filter (full-text index with relevance rank)
+    rank = None
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Product.name.ilike(search_term),
-                Product.description.ilike(search_term)
-            )
-        )
+        query, rank = apply_search(query, search)
 
-    # Apply price range filters
+    # Apply price range filters. The count seeks the range in the price
+    # index. Unless the page is sorted by price, the page query keeps the
+    # range out of index selection (price + 0) so the planner walks the sort
+    # index and stops at the page limit instead of sorting the whole range
+    count_query = query
+    page_price = Product.price if sort_by == "price" else Product.price + 0
     if min_price is not None:
-        query = query.filter(Product.price >= min_price)
+        count_query = count_query.filter(Product.price >= min_price)
+        query = query.filter(page_price >= min_price)
     if max_price is not None:
-        query = query.filter(Product.price <= max_price)
+        count_query = count_query.filter(Product.price <= max_price)
+        query = query.filter(page_price <= max_price)
+
+    # Keyset pagination: seek past the cursor, no offset and no count
+    if cursor is not None:
+        try:
+            query = apply_keyset(query, sort_by or "created_at", sort_order, cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
 
-    # Get total count before pagination
-    total = query.count()
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(page_size + 1).all()
+        products = rows[:page_size]
+        next_cursor = None
+        if len(rows) > page_size:
+            next_cursor = encode_cursor(sort_by or "created_at", sort_order, products[-1])
+
+        return listing_response(
+            products,
+            fields,
+            page=page,
+            page_size=page_size,
+            next_cursor=next_cursor,
+        )
+
+    # Get total count before pagination (cached per normalized filter set)
+    filter_key = (version, category, search, min_price, max_price)
+    total, total_is_estimate = count_products(count_query, filter_key, count)
 
     # Apply sorting
-    sort_field = getattr(Product, sort_by, Product.created_at)
-    if sort_order.lower() == "asc":
-        query = query.order_by(sort_field.asc())
+    if sort_by is None:
+        sort_by = "relevance" if rank is not None else "created_at"
+
+    if sort_by == "relevance" and rank is not None:
+        # Best match first; newest first among equally relevant products
+        query = query.order_by(rank, Product.created_at.desc())
     else:
-        query = query.order_by(sort_field.desc())
+        sort_field = getattr(Product, sort_by, Product.created_at)
+        if sort_order == "asc":
+            query = query.order_by(sort_field.asc())
+        else:
+            query = query.order_by(sort_field.desc())
 
     # Apply pagination
     offset = (page - 1) * page_size
     products = query.offset(offset).limit(page_size).all()
 
     # Calculate total pages
-    total_pages = ceil(total / page_size) if total > 0 else 1
+    total_pages = None
+    if total is not None:
+        total_pages = ceil(total / page_size) if total > 0 else 1
 
-    return ProductListResponse(
-        products=products,
+    return listing_response(
+        products,
+        fields,
         total=total,
+        total_is_estimate=total_is_estimate,
         page=page,
         page_size=page_size,
         total_pages=total_pages,
     )
 
 
+def ranked_products(
+    db: Session,
+    *,
+    page: int,
+    page_size: int,
+    category: Optional[str],
+    search: str,
+    min_price: Optional[float],
+    max_price: Optional[float],
+    count: str,
+    fields: Optional[tuple[str, ...]] = None,
+) -> ProductListResponse:
+    """
+    Run a typo-tolerant search against the in-memory BM25 index.
+
+    Results are ordered by score; only the page's rows are loaded from the
+    database, by primary key.
+
+    Args:
+        db: Database session
+        (remaining arguments as normalized by get_products)
+
+    Returns:
+        Paginated product list with metadata
+    """
+    ranked_index.check_fingerprint(db)
+    if ranked_index.stale:
+        ranked_index.rebuild(db)
+
+    ids, total = ranked_index.search(
+        search,
+        offset=(page - 1) * page_size,
+        limit=page_size,
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+    )
+
+    found = {}
+    if ids:
+        query = db.query(Product).filter(Product.id.in_(ids))
+        if fields is not None:
+            query = query.options(load_only(*[getattr(Product, name) for name in fields]))
+        found = {product.id: product for product in query}
+        if len(found) < len(ids):
+            # Deleted by another process: rebuild before the next search
+            ranked_index.stale = True
+
+    total_pages = None
+    if count == "none":
+        total = None
+    else:
+        total_pages = ceil(total / page_size) if total > 0 else 1
+
+    return listing_response(
+        [found[product_id] for product_id in ids if product_id in found],
+        fields,
+        total=total,
+        page=page,
+        page_size=page_size,
+        total_pages=total_pages,
+    )
+
+
+@router.get("/facets", response_model=ProductFacetsResponse)
+def get_product_facets(
+    category: Optional[str] = Query(None, description="Filter by category"),
+    search: Optional[str] = Query(None, description="Search in name and description"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price filter"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price filter"),
+    if_none_match: Annotated[str | None, Header()] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Get product counts per category and per price bucket.
+
+    Category counts ignore the category filter so the other categories stay
+    visible; price bucket counts are for the selected category.
+
+    Args:
+        category: Filter by category
+        search: Search query for name and description
+        min_price: Minimum price filter
+        max_price: Maximum price filter
+        if_none_match: ETag of the client's cached copy, if any
+        db: Database session
+
+    Returns:
+        Category and price bucket counts (304 if the client's copy is current)
+    """
+    category = category or None
+    search = search.strip().lower() if search else None
+
+    version = get_static_catalog_version()
+    cache_key = (version, category, search, min_price, max_price)
+    def load_facets():
+        body = encode_response(compute_facets(db, category, search, min_price, max_price))
+        entry = (body_etag(body), body)
+        facet_cache.set(cache_key, entry)
+        return entry
+
+    cached = facet_cache.get(cache_key)
+    if cached is None:
+        cached = facet_flight.do(cache_key, load_facets)
+
+    etag, body = cached
+    return json_response(body, etag, if_none_match)
+
+
+def compute_facets(
+    db: Session,
+    category: Optional[str],
+    search: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+) -> ProductFacetsResponse:
+    """
+    Aggregate category and price bucket counts with a single grouped query.
+
+    Args:
+        db: Database session
+        category: Selected category, if any
+        search: Normalized search query, if any
+        min_price: Minimum price filter
+        max_price: Maximum price filter
+
+    Returns:
+        Facet counts
+    """
+    edges = settings.price_bucket_edges
+    bucket = case(
+        *[(Product.price < edge, index) for index, edge in enumerate(edges)],
+        else_=len(edges),
+    ).label("bucket")
+
+    query = db.query(Product.category, bucket, func.count(Product.id))
+    if search:
+        query, _ = apply_search(query, search)
+    if min_price is not None:
+        query = query.filter(Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.price <= max_price)
+
+    category_counts = {member.value: 0 for member in ProductCategory}
+    bucket_counts = [0] * (len(edges) + 1)
+    for row_category, row_bucket, row_count in query.group_by(Product.category, bucket).all():
+        category_counts[row_category] = category_counts.get(row_category, 0) + row_count
+        if category is None or row_category == category:
+            bucket_counts[row_bucket] += row_count
+
+    bounds = [0.0] + edges
+    return ProductFacetsResponse(
+        categories=[
+            CategoryFacet(category=name, count=count)
+            for name, count in category_counts.items()
+        ],
+        price_buckets=[
+            PriceBucketFacet(
+                min_price=bounds[index],
+                max_price=edges[index] if index < len(edges) else None,
+                count=count,
+            )
+            for index, count in enumerate(bucket_counts)
+        ],
+        total=sum(bucket_counts),
+    )
+
+
+@router.get("/suggest", response_model=ProductSuggestResponse)
+def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100, description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=25, description="Maximum number of suggestions"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get autocomplete suggestions for product and category names.
+
+    Served from the in-memory prefix index; the database is only read when
+    the index has to be rebuilt after a bulk catalog change.
+
+    Args:
+        q: Text typed so far
+        limit: Maximum number of suggestions
+        db: Database session
+
+    Returns:
+        Matching product and category suggestions
+    """
+    suggest_index.check_fingerprint(db)
+    if suggest_index.stale:
+        suggest_index.rebuild(db)
+
+    return ProductSuggestResponse(query=q, suggestions=suggest_index.suggest(q, limit))
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """
+    Get hit/miss counters for the in-process catalog caches.
+
+    Returns:
+        Catalog version and per-cache statistics
+    """
+    return cache_stats()
+
+
+def export_products_ndjson(updated_since: Optional[datetime]):
+    """
+    Yield every product as one JSON line, ordered by id.
+
+    Rows are streamed from a server-side cursor in fixed-size batches, so
+    memory use doesn't grow with the catalog. The generator owns its session
+    because request dependencies are closed before a streaming body is sent.
+
+    Args:
+        updated_since: Only export products updated at or after this time
+
+    Yields:
+        Encoded ProductResponse followed by a newline
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Product).order_by(Product.id)
+        if updated_since is not None:
+            query = query.filter(Product.updated_at >= updated_since)
+
+        rows = query.execution_options(stream_results=True).yield_per(settings.PRODUCT_EXPORT_BATCH_SIZE)
+        for product in rows:
+            yield encode_response(ProductResponse.model_validate(product)) + b"\n"
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def export_products(
+    updated_since: Optional[datetime] = Query(
+        None, description="Only export products updated at or after this time (ISO 8601)"
+    ),
+):
+    """
+    Stream the whole catalog as newline-delimited JSON.
+
+    Args:
+        updated_since: Incremental sync watermark (timestamps without a zone are UTC)
+
+    Returns:
+        NDJSON stream of products ordered by id
+    """
+    # updated_at is stored as naive UTC
+    if updated_since is not None and updated_since.tzinfo is not None:
+        updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return StreamingResponse(
+        export_products_ndjson(updated_since),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/changes")
+def get_product_changes(
+    since: Optional[int] = Query(
+        None, ge=0, description="Resume after this catalog version (defaults to Last-Event-ID)"
+    ),
+    last_event_id: Annotated[str | None, Header()] = None,
+):
+    """
+    Stream committed product changes as Server-Sent Events.
+
+    Each event carries the product id, catalog version, current price and
+    stock, and old/new values for price and stock when they changed. The
+    event id is the catalog version, so a reconnecting EventSource resumes
+    where it left off. A "reset" event means changes were missed and the
+    client should refetch what it caches.
+
+    Args:
+        since: Last catalog version the client has seen
+        last_event_id: Sent by EventSource on reconnect
+
+    Returns:
+        text/event-stream response
+
+    Raises:
+        HTTPException: If Last-Event-ID is not a version number
+    """
+    if since is None and last_event_id:
+        try:
+            since = int(last_event_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Last-Event-ID must be a catalog version"
+            )
+
+    return StreamingResponse(
+        stream_changes(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch", response_model=ProductBatchResponse)
+def get_products_batch(batch: ProductBatchRequest, db: Session = Depends(get_db)):
+    """
+    Get several products by ID with a single query.
+
+    Args:
+        batch: Product IDs to fetch
+        db: Database session
+
+    Returns:
+        Found products keyed by id and the list of ids that don't exist
+    """
+    ids = list(dict.fromkeys(batch.ids))
+    products = db.query(Product).filter(Product.id.in_(ids)).all()
+
+    found = {product.id: product for product in products}
+
+    return ProductBatchResponse(
+        products=found,
+        missing=[product_id for product_id in ids if product_id not in found],
+    )
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+def get_product(
+    product_id: int,
+    if_none_match: Annotated[str | None, Header()] = None,
+    db: Session = Depends(get_db),
+):
     """
     Get a single product by ID.
 
     Args:
         product_id: Product ID
+        if_none_match: ETag of the client's cached copy, if any
         db: Database session
 
     Returns:
-        Product data
+        Product data (304 if the client's copy is current)
 
     Raises:
         HTTPException: If product not found
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    static_body = None
+    # Known-missing ids are answered without touching the database
+    if product_ids.may_exist(db, product_id):
+        if snapshot_enabled():
+            snapshot = get_snapshot(db)
+            position = snapshot.product_position(product_id)
+            if position is not None:
+                static_body = snapshot.product_body(position)
+        else:
+            cache_key = (get_static_catalog_version(), product_id)
+
+            def load_product():
+                body = load_static_product(db, product_id)
+                if body is not None:
+                    detail_cache.set(cache_key, body)
+                return body
+
+            static_body = detail_cache.get(cache_key)
+            if static_body is None:
+                static_body = detail_flight.do(cache_key, load_product)
 
-    if not product:
+    # Pre-encoded static body plus current stock: skip response validation
+    rendered = render_product(db, product_id, static_body) if static_body is not None else None
+    if rendered is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with id {product_id} not found"
         )
 
-    return product
+    etag, body = rendered
+    return json_response(body, etag, if_none_match)
@@ -34,6 +34,29 @@ class Settings(BaseSettings):
     RATE_LIMIT_PER_MINUTE: int = 60
     AUTH_RATE_LIMIT_PER_MINUTE: int = 5
 
+    # Catalog caching
+    PRODUCT_CACHE_SIZE: int = 2048
+    PRODUCT_CACHE_TTL_SECONDS: float = 300
+    PRODUCT_COUNT_CACHE_SIZE: int = 1024
+    PRODUCT_STOCK_CACHE_SIZE: int = 65536
+    PRODUCT_STOCK_TTL_SECONDS: float = 2
+    PRODUCT_ID_SET_MAX_SIZE: int = 1_000_000
+    PRODUCT_ID_SET_REFRESH_SECONDS: float = 1
+    PRODUCT_ID_SET_REBUILD_SECONDS: float = 300
+    PRODUCT_COUNT_ESTIMATE_CAP: int = 1000
+    PRODUCT_HTTP_MAX_AGE: int = 0
+    PRODUCT_PRICE_BUCKETS: str = "25,50,100,200,500"
+    PRODUCT_SNAPSHOT_ENABLED: bool = False
+    PRODUCT_SNAPSHOT_SHARED_DIR: str = ""
+    PRODUCT_SNAPSHOT_FINGERPRINT_SECONDS: float = 5
+    PRODUCT_SEARCH_FINGERPRINT_SECONDS: float = 5
+    PRODUCT_EXPORT_BATCH_SIZE: int = 500
+
+    # Product change feed (SSE)
+    PRODUCT_CHANGE_FEED_SIZE: int = 1000
+    PRODUCT_CHANGE_FEED_HEARTBEAT_SECONDS: float = 15
+    PRODUCT_CHANGE_FEED_RETRY_MS: int = 3000
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
     @property
@@ -41,6 +64,11 @@ class Settings(BaseSettings):
         """Convert CORS origins string to list."""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def price_bucket_edges(self) -> list[float]:
+        """Convert price bucket boundaries string to a sorted list."""
+        return sorted(float(edge) for edge in self.PRODUCT_PRICE_BUCKETS.split(","))
+
 
 # Global settings instance
 settings = Settings()
@@ -0,0 +1,277 @@
+"""
+Catalog change tracking.
+
+Product inserts, updates and deletes (including bulk query updates/deletes)
+are recorded on the session. When that session commits, the in-process
+catalog version is bumped and registered listeners receive a CatalogChange
+describing what changed, so caches and indexes derived from the products
+table can invalidate or update themselves.
+
+Stock moves on every order while the rest of a product almost never
+changes, so a separate static catalog version only advances when something
+other than stock (and the updated_at it touches) changed. Caches of static
+product data are keyed by it and survive purchases.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from sqlalchemy import Integer, cast, event, func, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.models.product import Product
+
+# Product columns captured for listeners on insert/update
+TRACKED_COLUMNS = ("id", "name", "description", "category", "price", "stock", "updated_at")
+
+# Columns that change with inventory rather than with the catalog itself
+VOLATILE_COLUMNS = ("stock", "updated_at")
+
+
+@dataclass
+class CatalogChange:
+    """Products changed by one committed transaction."""
+
+    version: int = 0
+    # Product id -> tracked column values after the change
+    updated: dict[int, dict] = field(default_factory=dict)
+    # Ids among updated that were inserted by this transaction
+    created: set[int] = field(default_factory=set)
+    # Product id -> tracked column values before the transaction, for
+    # updated products and only the columns that changed
+    previous: dict[int, dict] = field(default_factory=dict)
+    deleted: set[int] = field(default_factory=set)
+    # Ids among updated whose non-volatile columns changed
+    static_changed: set[int] = field(default_factory=set)
+    # Set when a bulk statement changed rows we can't enumerate
+    full: bool = False
+
+    @property
+    def volatile_only(self) -> bool:
+        """Whether only stock levels changed (static product data is unchanged)."""
+        return not (self.full or self.created or self.deleted or self.static_changed)
+
+
+_version = 0
+_static_version = 0
+_version_lock = threading.RLock()
+_listeners: list[Callable[[CatalogChange], None]] = []
+
+_CHANGES_KEY = "catalog_changes"
+
+
+def get_catalog_version() -> int:
+    """Return the current catalog version."""
+    return _version
+
+
+def get_static_catalog_version() -> int:
+    """Return the version of static product data (ignores stock-only changes)."""
+    return _static_version
+
+
+def catalog_fingerprint(db: Session) -> str:
+    """
+    Cheap summary of the static product data used to detect out-of-band changes.
+
+    Catches changes made by processes that don't go through this process's
+    catalog change events (other workers, the seed scripts). Stock and
+    updated_at are left out so purchases don't change the fingerprint.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Fingerprint string
+    """
+    # Weight each row by its id so edits that cancel out across rows still
+    # show up; prices are summed in cents to keep the sum exact
+    text_length = (
+        func.length(Product.name)
+        + func.length(Product.description)
+        + func.length(Product.category)
+        + func.length(Product.image_url)
+    )
+    row = db.query(
+        func.count(Product.id),
+        func.sum(Product.id),
+        func.max(Product.created_at),
+        func.sum(cast(func.round(Product.price * 100), Integer) * Product.id),
+        func.sum(text_length * Product.id),
+    ).one()
+    return ":".join(str(value) for value in row)
+
+
+class FingerprintCheck:
+    """
+    Rate-limited check for catalog changes made by other processes.
+
+    For in-memory indexes that are otherwise only kept in sync from this
+    process's catalog change events.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._fingerprint: str | None = None
+        self._checked_at = 0.0
+
+    def reset(self, db: Session) -> None:
+        """
+        Remember the current fingerprint (call when rebuilding from the database).
+
+        Args:
+            db: Database session
+        """
+        self._checked_at = time.monotonic()
+        self._fingerprint = catalog_fingerprint(db)
+
+    def changed(self, db: Session) -> bool:
+        """
+        Return whether the fingerprint moved since the last reset.
+
+        Queries the database at most once per interval_seconds.
+
+        Args:
+            db: Database session
+
+        Returns:
+            True if the catalog changed (or was never fingerprinted)
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.interval_seconds:
+            return False
+        self._checked_at = now
+        return catalog_fingerprint(db) != self._fingerprint
+
+
+def on_catalog_change(
+    callback: Callable[[CatalogChange], None]
+) -> Callable[[CatalogChange], None]:
+    """
+    Register a callback invoked after each committed catalog change.
+
+    Args:
+        callback: Function taking the CatalogChange (with the new version)
+
+    Returns:
+        The callback, so this can be used as a decorator
+    """
+    _listeners.append(callback)
+    return callback
+
+
+def bump_catalog_version(change: CatalogChange | None = None) -> int:
+    """
+    Advance the catalog version and notify listeners.
+
+    Args:
+        change: What changed; None means unknown (treated as a full change)
+
+    Returns:
+        The new catalog version
+    """
+    global _version, _static_version
+
+    if change is None:
+        change = CatalogChange(full=True)
+
+    # Listeners run under the lock so they see changes in version order
+    with _version_lock:
+        _version += 1
+        change.version = _version
+        if not change.volatile_only:
+            _static_version += 1
+
+        for callback in _listeners:
+            callback(change)
+
+    return change.version
+
+
+def _pending_changes(session: Session) -> CatalogChange:
+    changes = session.info.get(_CHANGES_KEY)
+    if changes is None:
+        changes = session.info[_CHANGES_KEY] = CatalogChange()
+    return changes
+
+
+def _record_write(target) -> CatalogChange | None:
+    session = object_session(target)
+    if session is None:
+        return None
+    changes = _pending_changes(session)
+    changes.deleted.discard(target.id)
+    changes.updated[target.id] = {name: getattr(target, name) for name in TRACKED_COLUMNS}
+    return changes
+
+
+@event.listens_for(Product, "after_insert")
+def _product_inserted(mapper, connection, target):
+    changes = _record_write(target)
+    if changes is not None:
+        changes.created.add(target.id)
+
+
+@event.listens_for(Product.price, "set", active_history=True)
+@event.listens_for(Product.stock, "set", active_history=True)
+def _load_previous_value(target, value, oldvalue, initiator):
+    # Nothing to do: active_history makes SQLAlchemy load the old value when
+    # an expired instance (e.g. after a commit) is assigned, so the change
+    # feed's price/stock deltas don't come out empty
+    pass
+
+
+@event.listens_for(Product, "after_update")
+def _product_updated(mapper, connection, target):
+    changes = _record_write(target)
+    if changes is None or target.id in changes.created:
+        return
+
+    # Attribute history is still pending here; keep the oldest value if the
+    # transaction flushes the same product more than once
+    previous = changes.previous.setdefault(target.id, {})
+    attrs = inspect(target).attrs
+    for name in TRACKED_COLUMNS:
+        deleted = attrs[name].history.deleted
+        if deleted:
+            previous.setdefault(name, deleted[0])
+
+    if any(
+        attrs[column.key].history.has_changes()
+        for column in mapper.column_attrs
+        if column.key not in VOLATILE_COLUMNS
+    ):
+        changes.static_changed.add(target.id)
+
+
+@event.listens_for(Product, "after_delete")
+def _product_deleted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        changes = _pending_changes(session)
+        changes.updated.pop(target.id, None)
+        changes.previous.pop(target.id, None)
+        changes.created.discard(target.id)
+        changes.deleted.add(target.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _product_bulk_statement(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(mapper.class_ is Product for mapper in orm_execute_state.all_mappers):
+        _pending_changes(orm_execute_state.session).full = True
+
+
+@event.listens_for(Session, "after_commit")
+def _session_committed(session):
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if changes is not None:
+        bump_catalog_version(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _session_rolled_back(session):
+    session.info.pop(_CHANGES_KEY, None)
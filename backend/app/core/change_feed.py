@@ -0,0 +1,190 @@
+"""
+Product change feed.
+
+Committed catalog changes are turned into per-product events (id, catalog
+version, current price and stock, and the old/new values of price and
+stock when they changed) and kept in a bounded in-memory buffer. Server-Sent
+Events subscribers wait on the buffer and resume from the last version they
+saw; a subscriber that fell out of the buffer, or a change that can't be
+enumerated (bulk statements), gets a "reset" event telling it to resync.
+
+Versions are per process, like the catalog version they come from.
+"""
+
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import AsyncIterator, Optional
+
+from app.config import settings
+from app.core.catalog import CatalogChange, get_catalog_version, on_catalog_change
+
+# Columns whose old and new values are included in update events
+DELTA_COLUMNS = ("price", "stock")
+
+
+def change_events(change: CatalogChange) -> list[dict]:
+    """
+    Build feed events for one committed catalog change.
+
+    Args:
+        change: Products changed by one transaction
+
+    Returns:
+        Events ordered by product id (a single reset event for full changes)
+    """
+    if change.full:
+        return [{"version": change.version, "type": "reset"}]
+
+    events = []
+    for product_id in sorted(change.updated):
+        values = change.updated[product_id]
+        previous = change.previous.get(product_id, {})
+        events.append({
+            "version": change.version,
+            "type": "created" if product_id in change.created else "updated",
+            "id": product_id,
+            "price": values["price"],
+            "stock": values["stock"],
+            "changes": {
+                name: {"old": previous[name], "new": values[name]}
+                for name in DELTA_COLUMNS
+                if name in previous
+            },
+        })
+    for product_id in sorted(change.deleted):
+        events.append({"version": change.version, "type": "deleted", "id": product_id})
+    return events
+
+
+class ChangeFeed:
+    """Bounded buffer of change events with async subscribers."""
+
+    def __init__(self, maxlen: int):
+        self._events: deque[dict] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        # (event loop, asyncio.Event) per waiting subscriber
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def publish(self, events: list[dict]) -> None:
+        """
+        Append events and wake subscribers (safe to call from any thread).
+
+        Args:
+            events: Events to append
+        """
+        with self._lock:
+            self._events.extend(events)
+            waiters = list(self._waiters)
+
+        for loop, wakeup in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:  # subscriber's loop already closed
+                pass
+
+    def latest_version(self) -> int:
+        """Return the version of the newest published event (0 if none)."""
+        with self._lock:
+            return self._events[-1]["version"] if self._events else 0
+
+    def since(self, version: int) -> tuple[list[dict], bool]:
+        """
+        Return buffered events newer than a version.
+
+        Args:
+            version: Last version the subscriber has seen
+
+        Returns:
+            Tuple of (events, whether events after version were dropped)
+        """
+        with self._lock:
+            events = [event for event in self._events if event["version"] > version]
+            oldest = self._events[0]["version"] if self._events else None
+
+        current = get_catalog_version()
+        if version > current:
+            # Version from before a restart; nothing here is comparable
+            return [], True
+        if oldest is None:
+            return [], False
+        return events, version < oldest - 1
+
+    async def subscribe(self, version: int, heartbeat: float) -> AsyncIterator[list[dict]]:
+        """
+        Yield batches of events newer than version as they are published.
+
+        An empty batch is yielded after heartbeat seconds without events so
+        the caller can keep the connection alive. A gap produces a reset
+        event, after which the stream continues from the current version.
+
+        Args:
+            version: Last version the subscriber has seen
+            heartbeat: Seconds between keep-alive batches
+
+        Yields:
+            Lists of events
+        """
+        wakeup = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), wakeup)
+        with self._lock:
+            self._waiters.add(waiter)
+
+        try:
+            while True:
+                wakeup.clear()
+                events, gap = self.since(version)
+                if gap:
+                    # The catalog version may already name a change still
+                    # being published, so resync from the newest published one
+                    version = self.latest_version()
+                    events = [{"version": version, "type": "reset"}]
+                    events += self.since(version)[0]
+
+                if events:
+                    version = events[-1]["version"]
+                    yield events
+                    continue
+
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield []
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+def format_sse(event: dict) -> bytes:
+    """Encode an event as a Server-Sent Events message (id is the version)."""
+    return f"id: {event['version']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+
+
+async def stream_changes(version: Optional[int]) -> AsyncIterator[bytes]:
+    """
+    Stream change events as SSE messages.
+
+    Args:
+        version: Last version the client has seen (None starts from now)
+
+    Yields:
+        Encoded SSE messages and keep-alive comments
+    """
+    if version is None:
+        version = change_feed.latest_version()
+
+    yield f"retry: {settings.PRODUCT_CHANGE_FEED_RETRY_MS}\n\n".encode("utf-8")
+    async for events in change_feed.subscribe(version, settings.PRODUCT_CHANGE_FEED_HEARTBEAT_SECONDS):
+        if not events:
+            yield b": keep-alive\n\n"
+        for event in events:
+            yield format_sse(event)
+
+
+change_feed = ChangeFeed(maxlen=settings.PRODUCT_CHANGE_FEED_SIZE)
+
+
+@on_catalog_change
+def _publish_changes(change: CatalogChange) -> None:
+    change_feed.publish(change_events(change))
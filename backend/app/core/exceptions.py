@@ -93,6 +93,16 @@ class CartNotFoundError(HTTPException):
         )
 
 
+class CartConflictError(HTTPException):
+    """Exception raised when a concurrent request changed the cart mid-update."""
+
+    def __init__(self, detail: str = "Cart was changed by another request, please retry"):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=detail,
+        )
+
+
 class OrderNotFoundError(HTTPException):
     """Exception raised when an order is not found."""
 
@@ -0,0 +1,90 @@
+"""
+HTTP caching helpers: strong ETags, Cache-Control and conditional GET.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Response, status
+
+from app.config import settings
+
+
+def body_etag(body: bytes) -> str:
+    """
+    Build a strong ETag from a response body.
+
+    Args:
+        body: Encoded response body
+
+    Returns:
+        Quoted ETag value
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against the current ETag.
+
+    Args:
+        if_none_match: Raw If-None-Match header value, if any
+        etag: Current quoted ETag
+
+    Returns:
+        True if the client's cached representation is still current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    # If-None-Match uses weak comparison, so ignore W/ prefixes
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    """
+    Headers that let clients cache a catalog response and revalidate it.
+
+    Args:
+        etag: Quoted ETag value
+
+    Returns:
+        ETag and Cache-Control headers
+    """
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.PRODUCT_HTTP_MAX_AGE}, must-revalidate",
+    }
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Build a 304 Not Modified response.
+
+    Args:
+        etag: Quoted ETag value
+
+    Returns:
+        Empty 304 response carrying the cache headers
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+
+
+def json_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    """
+    Send a pre-encoded JSON body, or 304 if the client already has it.
+
+    Args:
+        body: Encoded JSON body
+        etag: Quoted ETag value for body
+        if_none_match: Raw If-None-Match header value, if any
+
+    Returns:
+        200 response with the body, or an empty 304 response
+    """
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag))
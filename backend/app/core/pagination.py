@@ -0,0 +1,134 @@
+"""
+Keyset (cursor) pagination helpers for the product catalog.
+
+A cursor is an opaque URL-safe token encoding the sort the client is paging
+through and the (sort value, id) of the last product it received. The next
+page is fetched with a range condition on an index instead of an OFFSET, so
+every page costs the same no matter how deep the client has paged.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from app.models.product import Product
+
+# Sort fields that support cursor pagination
+CURSOR_SORT_FIELDS = {
+    "price": Product.price,
+    "name": Product.name,
+    "created_at": Product.created_at,
+}
+
+
+def _serialize_value(sort_by: str, value: Any) -> Any:
+    """Convert a sort value to a JSON-compatible value."""
+    if sort_by == "created_at":
+        return value.isoformat()
+    return value
+
+
+def _deserialize_value(sort_by: str, value: Any) -> Any:
+    """Convert a JSON value from a cursor back to a sort value."""
+    if sort_by == "created_at":
+        return datetime.fromisoformat(value)
+    if sort_by == "price":
+        return float(value)
+    return str(value)
+
+
+def encode_cursor(sort_by: str, sort_order: str, product: Product) -> str:
+    """
+    Build the cursor pointing just past a product.
+
+    Args:
+        sort_by: Sort field (price, name, created_at)
+        sort_order: Sort order (asc, desc)
+        product: Last product of the current page
+
+    Returns:
+        Opaque cursor token
+    """
+    payload = {
+        "s": sort_by,
+        "o": sort_order,
+        "v": _serialize_value(sort_by, getattr(product, sort_by)),
+        "id": product.id,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Opaque cursor token
+        sort_by: Sort field of the current request
+        sort_order: Sort order of the current request
+
+    Returns:
+        Tuple of (last sort value, last product id)
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        cursor_sort, cursor_order = payload["s"], payload["o"]
+        value = _deserialize_value(cursor_sort, payload["v"])
+        last_id = int(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+    if cursor_sort != sort_by or cursor_order != sort_order:
+        raise ValueError("Cursor does not match the requested sort order")
+
+    return value, last_id
+
+
+def apply_keyset(
+    query: Query,
+    sort_by: str,
+    sort_order: str,
+    cursor: Optional[str],
+) -> Query:
+    """
+    Order a Product query by (sort field, id) and seek past the cursor.
+
+    Args:
+        query: Filtered Product query
+        sort_by: Sort field (price, name, created_at)
+        sort_order: Sort order (asc, desc)
+        cursor: Cursor from the previous page, or None/empty for the first page
+
+    Returns:
+        Ordered query starting right after the cursor position
+
+    Raises:
+        ValueError: If the sort field is not supported or the cursor is invalid
+    """
+    if sort_by not in CURSOR_SORT_FIELDS:
+        raise ValueError(
+            f"Cursor pagination supports sort_by {', '.join(CURSOR_SORT_FIELDS)}"
+        )
+
+    sort_field = CURSOR_SORT_FIELDS[sort_by]
+    key = tuple_(sort_field, Product.id)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by, sort_order)
+        if sort_order == "asc":
+            query = query.filter(key > tuple_(value, last_id))
+        else:
+            query = query.filter(key < tuple_(value, last_id))
+
+    if sort_order == "asc":
+        return query.order_by(sort_field.asc(), Product.id.asc())
+    return query.order_by(sort_field.desc(), Product.id.desc())
@@ -0,0 +1,310 @@
+"""
+Read-through caches for catalog reads.
+
+Detail and listing caches hold JSON-encoded static product data, so a hit
+skips ORM hydration, pydantic validation and JSON encoding entirely. Stock
+and updated_at are left out of those bodies: they come from a small stock
+cache with a short TTL, refreshed with one query per response for whatever
+expired, and are spliced in when the response is rendered. A purchase then
+refreshes one stock entry instead of invalidating every cached product and
+listing.
+
+Keys start with the static catalog version captured before the database
+was read, so a result computed while a product change was being committed
+can never be served after that change. Caches are also cleared on every
+static catalog change to release memory held by stale entries.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import LRUCache, SingleFlight
+from app.core.catalog import (
+    VOLATILE_COLUMNS,
+    CatalogChange,
+    get_catalog_version,
+    get_static_catalog_version,
+    on_catalog_change,
+)
+from app.core.http_cache import body_etag
+from app.core.product_ids import product_ids
+from app.models.product import Product
+from app.schemas.product import ProductFieldsListResponse, ProductListResponse, ProductResponse, ProductStock
+
+# Exact listing totals keyed by (static version, category, search, min_price, max_price)
+count_cache = LRUCache(
+    maxsize=settings.PRODUCT_COUNT_CACHE_SIZE,
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+)
+
+# Static ProductResponse body keyed by (static version, product_id)
+detail_cache = LRUCache(
+    maxsize=settings.PRODUCT_CACHE_SIZE,
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+)
+
+# CachedListing keyed by (static version, normalized listing parameters)
+listing_cache = LRUCache(
+    maxsize=settings.PRODUCT_CACHE_SIZE,
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+)
+
+# (ETag, encoded ProductFacetsResponse body) keyed by (static version, normalized filters)
+facet_cache = LRUCache(
+    maxsize=settings.PRODUCT_CACHE_SIZE,
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+)
+
+# (updated_at, encoded ProductStock body) keyed by product id
+stock_cache = LRUCache(
+    maxsize=settings.PRODUCT_STOCK_CACHE_SIZE,
+    ttl=settings.PRODUCT_STOCK_TTL_SECONDS,
+)
+
+# Coalesce concurrent fills of the same detail, listing or facet cache key
+detail_flight = SingleFlight()
+listing_flight = SingleFlight()
+facet_flight = SingleFlight()
+
+FLIGHTS = {
+    "detail": detail_flight,
+    "listing": listing_flight,
+    "facets": facet_flight,
+}
+
+STATIC_CACHES = {
+    "count": count_cache,
+    "detail": detail_cache,
+    "listing": listing_cache,
+    "facets": facet_cache,
+}
+
+CACHES = {**STATIC_CACHES, "stock": stock_cache}
+
+_VOLATILE_FIELDS = set(VOLATILE_COLUMNS)
+
+# ProductResponse fields in response order, and the static ones among them
+PRODUCT_FIELDS = tuple(ProductResponse.model_fields)
+STATIC_FIELDS = tuple(name for name in PRODUCT_FIELDS if name not in _VOLATILE_FIELDS)
+
+# Built once so SQLAlchemy reuses the compiled statement on every detail miss
+_product_by_id = select(
+    *[Product.__table__.c[name] for name in PRODUCT_FIELDS]
+).where(Product.__table__.c.id == bindparam("product_id"))
+
+# Rows come from the database, so serialize them without re-validating
+_row_adapter = TypeAdapter(dict[str, Any])
+
+
+@dataclass(frozen=True)
+class CachedListing:
+    """Encoded listing envelope and static product bodies, before the stock merge."""
+
+    # ProductListResponse encoded with an empty products list
+    envelope: bytes
+    # (product id, static product body) in listing order
+    products: tuple[tuple[int, bytes], ...]
+    # Sparse fieldset bodies are complete and skip the stock merge
+    merge_stock: bool = True
+
+
+def _stock_entry(stock: int, updated_at: datetime) -> tuple[datetime, bytes]:
+    return updated_at, encode_response(ProductStock(stock=stock, updated_at=updated_at))
+
+
+@on_catalog_change
+def _clear_caches(change: CatalogChange) -> None:
+    if change.full:
+        stock_cache.clear()
+    else:
+        # Committed values are current; no need to wait for the TTL
+        for product_id, values in change.updated.items():
+            stock_cache.set(product_id, _stock_entry(values["stock"], values["updated_at"]))
+
+    if change.volatile_only:
+        return
+    for cache in STATIC_CACHES.values():
+        cache.clear()
+
+
+def encode_response(model: BaseModel) -> bytes:
+    """
+    Serialize a response schema to the JSON body FastAPI would send.
+
+    Args:
+        model: Response schema instance
+
+    Returns:
+        UTF-8 encoded JSON body
+    """
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def encode_static_product(model: ProductResponse) -> bytes:
+    """
+    Serialize a product without its volatile fields (stock, updated_at).
+
+    Args:
+        model: Product response schema instance
+
+    Returns:
+        UTF-8 encoded JSON object
+    """
+    return model.__pydantic_serializer__.to_json(model, exclude=_VOLATILE_FIELDS)
+
+
+def load_static_product(db: Session, product_id: int) -> Optional[bytes]:
+    """
+    Read one product with a Core select and encode its static body.
+
+    Skips ORM hydration and pydantic validation: the row mapping, already in
+    ProductResponse field order, is serialized directly and produces the
+    same bytes as encode_static_product. The stock columns read alongside
+    refresh the stock cache, so rendering needs no second query.
+
+    Args:
+        db: Database session
+        product_id: Product ID
+
+    Returns:
+        Static product body, or None if the product doesn't exist
+    """
+    row = db.execute(_product_by_id, {"product_id": product_id}).mappings().first()
+    if row is None:
+        return None
+
+    stock_cache.set(product_id, _stock_entry(row["stock"], row["updated_at"]))
+    return _row_adapter.dump_json({name: row[name] for name in STATIC_FIELDS})
+
+
+def encode_listing(response: ProductListResponse) -> CachedListing:
+    """
+    Split a listing into its envelope and static product bodies.
+
+    Args:
+        response: Listing as built from the database
+
+    Returns:
+        Cacheable listing
+    """
+    envelope = encode_response(response.model_copy(update={"products": []}))
+    if isinstance(response, ProductFieldsListResponse):
+        return CachedListing(
+            envelope=envelope,
+            products=tuple(
+                (product.id, product.__pydantic_serializer__.to_json(product, exclude_unset=True))
+                for product in response.products
+            ),
+            merge_stock=False,
+        )
+
+    return CachedListing(
+        envelope=envelope,
+        products=tuple((product.id, encode_static_product(product)) for product in response.products),
+    )
+
+
+def get_stock(db: Session, product_ids: Iterable[int]) -> dict[int, tuple[datetime, bytes]]:
+    """
+    Return current stock entries, loading missing or expired ones in one query.
+
+    Args:
+        db: Database session
+        product_ids: Products to look up
+
+    Returns:
+        Product id -> (updated_at, encoded ProductStock body); ids that no
+        longer exist are absent
+    """
+    stock = {}
+    missing = []
+    for product_id in product_ids:
+        entry = stock_cache.get(product_id)
+        if entry is None:
+            missing.append(product_id)
+        else:
+            stock[product_id] = entry
+
+    if missing:
+        rows = db.query(Product.id, Product.stock, Product.updated_at).filter(Product.id.in_(missing))
+        for product_id, quantity, updated_at in rows:
+            stock[product_id] = _stock_entry(quantity, updated_at)
+            stock_cache.set(product_id, stock[product_id])
+
+    return stock
+
+
+def _merge(static_body: bytes, stock_body: bytes) -> bytes:
+    # {"name":...,"created_at":...} + {"stock":...,"updated_at":...}
+    return static_body[:-1] + b"," + stock_body[1:]
+
+
+def render_product(db: Session, product_id: int, static_body: bytes) -> Optional[tuple[str, bytes]]:
+    """
+    Merge current stock into a static product body.
+
+    The ETag hashes the merged body, like listings: the static body can
+    outlive the stock entry's updated_at (changes made by other processes
+    only reach it when the detail cache expires), and an ETag derived from
+    updated_at would then let clients revalidate stale content.
+
+    Args:
+        db: Database session
+        product_id: Product ID
+        static_body: Body from encode_static_product
+
+    Returns:
+        Tuple of (ETag, ProductResponse body), or None if the product is gone
+    """
+    entry = get_stock(db, [product_id]).get(product_id)
+    if entry is None:
+        return None
+    body = _merge(static_body, entry[1])
+    return body_etag(body), body
+
+
+def render_listing(db: Session, listing: CachedListing) -> tuple[str, bytes]:
+    """
+    Merge current stock into a cached listing.
+
+    Args:
+        db: Database session
+        listing: Listing from encode_listing
+
+    Returns:
+        Tuple of (ETag, ProductListResponse body)
+    """
+    if listing.merge_stock:
+        stock = get_stock(db, [product_id for product_id, _ in listing.products])
+        products = b",".join(
+            _merge(static_body, stock[product_id][1])
+            for product_id, static_body in listing.products
+            if product_id in stock
+        )
+    else:
+        products = b",".join(body for _, body in listing.products)
+    body = listing.envelope.replace(b'"products":[]', b'"products":[' + products + b"]", 1)
+    return body_etag(body), body
+
+
+def cache_stats() -> dict:
+    """
+    Collect hit/miss counters for every catalog cache.
+
+    Returns:
+        Catalog versions, per-cache statistics, single-flight and negative
+        cache counters
+    """
+    return {
+        "catalog_version": get_catalog_version(),
+        "static_catalog_version": get_static_catalog_version(),
+        "caches": {name: cache.stats() for name, cache in CACHES.items()},
+        "single_flight": {name: flight.stats() for name, flight in FLIGHTS.items()},
+        "product_ids": product_ids.stats(),
+    }
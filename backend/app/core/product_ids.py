@@ -0,0 +1,156 @@
+"""
+Negative cache for product detail reads.
+
+Keeps the set of existing product ids in memory so requests for ids that
+don't exist (scrapers, stale links) get their 404 without a database query.
+The set is built from the database once, updated from catalog change
+events, and extended from the database for ids near or above the highest
+one it has seen, which is how products created by other worker processes
+are picked up. That tail check runs at most once per
+PRODUCT_ID_SET_REFRESH_SECONDS, so floods of large ids cost at most one
+indexed query per interval. It rereads the last TAIL_LAG_IDS ids below the
+highest one too, because sequence ids can commit out of order (PostgreSQL).
+The whole set is rebuilt every PRODUCT_ID_SET_REBUILD_SECONDS as a backstop.
+
+Products deleted elsewhere still fall through to the database, which
+answers 404 as before. The set can wrongly answer 404 in two cases:
+
+- A product created by another process less than
+  PRODUCT_ID_SET_REFRESH_SECONDS after the last tail check.
+- An id that committed more than TAIL_LAG_IDS ids behind the highest one.
+  It is found at the next full rebuild.
+"""
+
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.catalog import CatalogChange, on_catalog_change
+from app.models.product import Product
+
+# Ids below the highest seen one that the tail check rereads
+TAIL_LAG_IDS = 1000
+
+
+class ProductIdSet:
+    """In-memory set of existing product ids."""
+
+    def __init__(self, max_size: int, refresh_seconds: float, rebuild_seconds: float):
+        self.max_size = max_size
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.rejected = 0
+        self._ids: set[int] = set()
+        # Every id up to this one was read from the database
+        self._max_id = 0
+        self._tail_checked_at = 0.0
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self.enabled = True
+        self.stale = True
+
+    def rebuild(self, db: Session) -> None:
+        """
+        Reload every product id from the database.
+
+        Disables the filter when the catalog is larger than max_size.
+
+        Args:
+            db: Database session
+        """
+        ids = {product_id for (product_id,) in db.query(Product.id)}
+
+        with self._lock:
+            self.enabled = len(ids) <= self.max_size
+            self._ids = ids if self.enabled else set()
+            self._max_id = max(ids, default=0)
+            self._tail_checked_at = self._built_at = time.monotonic()
+            self.stale = False
+
+    def apply(self, change: CatalogChange) -> None:
+        """
+        Apply a committed catalog change.
+
+        Args:
+            change: Products changed by one transaction
+        """
+        if change.full:
+            self.stale = True
+            return
+
+        with self._lock:
+            # Created ids don't advance _max_id: other workers may have
+            # committed lower ids we haven't read yet
+            self._ids.update(change.created)
+            self._ids.difference_update(change.deleted)
+            if self.enabled and len(self._ids) > self.max_size:
+                self.stale = True
+
+    def _refresh_tail(self, db: Session) -> None:
+        now = time.monotonic()
+        if now - self._tail_checked_at < self.refresh_seconds:
+            return
+
+        with self._lock:
+            self._tail_checked_at = now
+            max_id = self._max_id
+
+        new_ids = [
+            product_id for (product_id,) in db.query(Product.id).filter(Product.id > max_id - TAIL_LAG_IDS)
+        ]
+
+        with self._lock:
+            self._ids.update(new_ids)
+            self._max_id = max(self._max_id, max(new_ids, default=0))
+            if len(self._ids) > self.max_size:
+                self.stale = True
+
+    def may_exist(self, db: Session, product_id: int) -> bool:
+        """
+        Return False if the product doesn't exist.
+
+        Can wrongly return False for products committed elsewhere very
+        recently or far out of id order (see the module docstring).
+
+        Args:
+            db: Database session (used to build the set or check new ids)
+            product_id: Product ID
+
+        Returns:
+            Whether the database has to be asked
+        """
+        if self.stale or time.monotonic() - self._built_at >= self.rebuild_seconds:
+            self.rebuild(db)
+        if not self.enabled or product_id in self._ids:
+            return True
+
+        if product_id > self._max_id - TAIL_LAG_IDS:
+            self._refresh_tail(db)
+            if product_id in self._ids:
+                return True
+
+        self.rejected += 1
+        return False
+
+    def stats(self) -> dict:
+        """Return size and rejected-lookup counters."""
+        return {
+            "enabled": self.enabled,
+            "size": len(self._ids),
+            "max_size": self.max_size,
+            "rejected": self.rejected,
+        }
+
+
+product_ids = ProductIdSet(
+    max_size=settings.PRODUCT_ID_SET_MAX_SIZE,
+    refresh_seconds=settings.PRODUCT_ID_SET_REFRESH_SECONDS,
+    rebuild_seconds=settings.PRODUCT_ID_SET_REBUILD_SECONDS,
+)
+
+
+@on_catalog_change
+def _update_product_ids(change: CatalogChange) -> None:
+    product_ids.apply(change)
@@ -0,0 +1,318 @@
+"""
+Typo-tolerant ranked product search.
+
+An in-process inverted index over product name and description scored
+with BM25. Query terms missing from the vocabulary (or close to other
+terms) are expanded to vocabulary terms within a small edit distance, found
+through a symmetric-delete index, so "backpak" still matches "backpack".
+Name terms count double so title matches outrank description mentions.
+
+Like the suggestion index, it is built from the database once, kept in
+sync from catalog change events and marked stale when the catalog
+fingerprint shows a change made by another process.
+"""
+
+import heapq
+import math
+import threading
+from collections import Counter, defaultdict
+from itertools import combinations
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.catalog import CatalogChange, FingerprintCheck, on_catalog_change
+from app.core.search import tokenize
+from app.models.product import Product
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Term frequency multiplier for words in the product name
+NAME_WEIGHT = 2
+
+# Deletes precomputed per vocabulary term (max edit distance supported)
+MAX_EDIT_DISTANCE = 2
+
+# Score multiplier for expanded terms by edit distance
+EXPANSION_WEIGHTS = {0: 1.0, 1: 0.6, 2: 0.35}
+
+
+def max_edit_distance(term: str) -> int:
+    """Allowed typo distance for a query term: none for short words."""
+    if len(term) <= 3:
+        return 0
+    if len(term) <= 7:
+        return 1
+    return 2
+
+
+def _deletes(term: str, distance: int) -> set[str]:
+    """Return term plus every string reachable by deleting up to distance chars."""
+    variants = {term}
+    for count in range(1, min(distance, len(term) - 1) + 1):
+        for positions in combinations(range(len(term)), count):
+            variants.add("".join(c for i, c in enumerate(term) if i not in positions))
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (edits plus adjacent transpositions).
+
+    Args:
+        a: First string
+        b: Second string
+        limit: Stop early and return limit + 1 once the distance exceeds it
+
+    Returns:
+        Distance, or limit + 1 if it exceeds limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class RankedSearchIndex:
+    """BM25 inverted index with typo-tolerant term expansion."""
+
+    def __init__(self):
+        self._reset()
+        self._lock = threading.RLock()
+        self._fingerprint = FingerprintCheck(settings.PRODUCT_SEARCH_FINGERPRINT_SECONDS)
+        self.stale = True
+
+    def check_fingerprint(self, db: Session) -> None:
+        """
+        Mark the index stale if the catalog changed in another process.
+
+        Args:
+            db: Database session
+        """
+        if self._fingerprint.changed(db):
+            self.stale = True
+
+    def _reset(self) -> None:
+        # Term -> product id -> weighted term frequency
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self._doc_terms: dict[int, Counter] = {}
+        self._doc_length: dict[int, int] = {}
+        # Product id -> (category, price) for filtering ranked results
+        self._doc_meta: dict[int, tuple[str, float]] = {}
+        # Deletion variant -> vocabulary terms producing it
+        self._delete_index: dict[str, set[str]] = defaultdict(set)
+        self._total_length = 0
+
+    # Index maintenance
+
+    def _add_term(self, term: str) -> None:
+        for variant in _deletes(term, MAX_EDIT_DISTANCE):
+            self._delete_index[variant].add(term)
+
+    def _drop_term(self, term: str) -> None:
+        for variant in _deletes(term, MAX_EDIT_DISTANCE):
+            terms = self._delete_index.get(variant)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._delete_index[variant]
+
+    def _remove_document(self, product_id: int) -> None:
+        terms = self._doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+                self._drop_term(term)
+        self._total_length -= self._doc_length.pop(product_id)
+        self._doc_meta.pop(product_id, None)
+
+    def _add_document(self, product_id: int, name: str, description: str, category: str, price: float) -> None:
+        terms = Counter(tokenize(description))
+        for term in tokenize(name):
+            terms[term] += NAME_WEIGHT
+
+        for term, frequency in terms.items():
+            if term not in self._postings:
+                self._add_term(term)
+            self._postings[term][product_id] = frequency
+
+        length = sum(terms.values())
+        self._doc_terms[product_id] = terms
+        self._doc_length[product_id] = length
+        self._doc_meta[product_id] = (category, price)
+        self._total_length += length
+
+    def rebuild(self, db: Session) -> None:
+        """
+        Rebuild the whole index from the database.
+
+        Args:
+            db: Database session
+        """
+        self._fingerprint.reset(db)
+        rows = db.query(
+            Product.id, Product.name, Product.description, Product.category, Product.price
+        ).all()
+
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self._add_document(*row)
+            self.stale = False
+
+    def apply(self, change: CatalogChange) -> None:
+        """
+        Apply a committed catalog change.
+
+        Args:
+            change: Products changed by one transaction
+        """
+        if change.full:
+            self.stale = True
+            return
+
+        with self._lock:
+            for product_id in change.deleted:
+                self._remove_document(product_id)
+            for product_id, values in change.updated.items():
+                # Stock-only updates leave the indexed fields unchanged
+                if product_id not in change.created and product_id not in change.static_changed:
+                    continue
+                self._remove_document(product_id)
+                self._add_document(
+                    product_id,
+                    values["name"],
+                    values["description"],
+                    values["category"],
+                    values["price"],
+                )
+
+    # Querying
+
+    def expand(self, term: str) -> dict[str, float]:
+        """
+        Map a query term to vocabulary terms and their score weights.
+
+        Args:
+            term: Normalized query term
+
+        Returns:
+            Dict of vocabulary term -> weight (empty if nothing is close)
+        """
+        limit = max_edit_distance(term)
+        expansions = {}
+        if term in self._postings:
+            expansions[term] = EXPANSION_WEIGHTS[0]
+
+        if limit:
+            candidates = set()
+            for variant in _deletes(term, limit):
+                candidates |= self._delete_index.get(variant, set())
+            for candidate in candidates - expansions.keys():
+                distance = edit_distance(term, candidate, limit)
+                if distance <= limit:
+                    expansions[candidate] = EXPANSION_WEIGHTS[distance]
+
+        return expansions
+
+    def search(
+        self,
+        query: str,
+        offset: int,
+        limit: int,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> tuple[list[int], int]:
+        """
+        Rank products for a query.
+
+        Args:
+            query: Raw search string
+            offset: Number of top results to skip
+            limit: Number of results to return
+            category: Category filter
+            min_price: Minimum price filter
+            max_price: Maximum price filter
+
+        Returns:
+            Tuple of (product ids in score order, total number of matches)
+        """
+        with self._lock:
+            document_count = len(self._doc_terms)
+            if not document_count:
+                return [], 0
+            average_length = self._total_length / document_count
+
+            scores: dict[int, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                # Best expansion per document so a typo can't score twice
+                term_scores: dict[int, float] = {}
+                for candidate, weight in self.expand(term).items():
+                    postings = self._postings[candidate]
+                    idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for product_id, frequency in postings.items():
+                        norm = K1 * (1 - B + B * self._doc_length[product_id] / average_length)
+                        score = weight * idf * frequency * (K1 + 1) / (frequency + norm)
+                        if score > term_scores.get(product_id, 0.0):
+                            term_scores[product_id] = score
+                for product_id, score in term_scores.items():
+                    scores[product_id] += score
+
+            matches = []
+            for product_id, score in scores.items():
+                product_category, price = self._doc_meta[product_id]
+                if category and product_category != category:
+                    continue
+                if min_price is not None and price < min_price:
+                    continue
+                if max_price is not None and price > max_price:
+                    continue
+                matches.append((score, -product_id))
+
+        top = heapq.nlargest(offset + limit, matches)
+        return [-negative_id for _, negative_id in top[offset:]], len(matches)
+
+
+ranked_index = RankedSearchIndex()
+
+
+@on_catalog_change
+def _update_ranked_index(change: CatalogChange) -> None:
+    ranked_index.apply(change)
+
+
+def init_ranked_index(db: Optional[Session] = None) -> None:
+    """
+    Build the ranked search index at startup.
+
+    Args:
+        db: Database session (a new one is opened if omitted)
+    """
+    from app.database import SessionLocal
+
+    session = db or SessionLocal()
+    try:
+        ranked_index.rebuild(session)
+    finally:
+        if db is None:
+            session.close()
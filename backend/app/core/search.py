@@ -0,0 +1,155 @@
+"""
+Full-text search support for the product catalog.
+
+SQLite uses an FTS5 virtual table (products_fts) kept in sync with the
+products table by triggers. PostgreSQL uses a GIN index over a tsvector
+expression. Any other backend falls back to ILIKE substring matching.
+"""
+
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.product import Product
+
+# Lightweight handle on the FTS5 table (not part of Base.metadata, so
+# create_all never tries to create it as a regular table)
+products_fts = table("products_fts", column("rowid"), column("rank"), column("products_fts"))
+
+# Must match the index expression exactly so PostgreSQL can use the GIN index
+PG_SEARCH_VECTOR = "to_tsvector('english', products.name || ' ' || products.description)"
+
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description,
+        content='products', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+POSTGRES_FTS_DDL = [
+    """
+    CREATE INDEX IF NOT EXISTS ix_products_search
+    ON products USING GIN (to_tsvector('english', name || ' ' || description))
+    """,
+]
+
+# Active search backend: "fts5", "postgresql" or "like"
+_backend = "like"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def init_search_index(engine: Engine) -> None:
+    """
+    Create the full-text index for the current database backend.
+
+    The SQLite index is rebuilt from the products table the first time it is
+    created so existing catalogs become searchable immediately.
+
+    Args:
+        engine: SQLAlchemy engine
+    """
+    global _backend
+
+    dialect = engine.dialect.name
+
+    if dialect == "sqlite":
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+            ).first()
+            try:
+                for statement in SQLITE_FTS_DDL:
+                    conn.execute(text(statement))
+            except Exception:
+                # SQLite built without FTS5 - keep the ILIKE fallback
+                _backend = "like"
+                return
+            if not exists:
+                conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+        _backend = "fts5"
+    elif dialect == "postgresql":
+        with engine.begin() as conn:
+            for statement in POSTGRES_FTS_DDL:
+                conn.execute(text(statement))
+        _backend = "postgresql"
+    else:
+        _backend = "like"
+
+
+def tokenize(search: str) -> list[str]:
+    """
+    Split a raw search string into lowercase word tokens.
+
+    Args:
+        search: Raw user search input
+
+    Returns:
+        List of word tokens (punctuation and query operators stripped)
+    """
+    return [token.lower() for token in _TOKEN_RE.findall(search)]
+
+
+def apply_search(query: Query, search: str) -> Tuple[Query, Optional[ColumnElement]]:
+    """
+    Restrict a Product query to rows matching the search string.
+
+    All terms must match; the last term is treated as a prefix so partially
+    typed words still match while the user is typing.
+
+    Args:
+        query: Product query to filter
+        search: Raw user search input
+
+    Returns:
+        Tuple of (filtered query, rank expression). Ordering ascending by the
+        rank expression puts the most relevant products first. The rank is
+        None when the ILIKE fallback is in use (no full-text index, or a
+        search string without any word characters).
+    """
+    terms = tokenize(search)
+
+    if terms and _backend == "fts5":
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        query = query.join(products_fts, products_fts.c.rowid == Product.id)\
+            .filter(products_fts.c.products_fts.match(match))
+        return query, products_fts.c.rank
+
+    if terms and _backend == "postgresql":
+        ts_query = func.to_tsquery(literal_column("'english'"), " & ".join(terms) + ":*")
+        vector = literal_column(PG_SEARCH_VECTOR)
+        query = query.filter(vector.op("@@")(ts_query))
+        return query, -func.ts_rank(vector, ts_query)
+
+    search_term = f"%{search}%"
+    query = query.filter(
+        Product.name.ilike(search_term) | Product.description.ilike(search_term)
+    )
+    return query, None
@@ -0,0 +1,247 @@
+"""
+Catalog snapshot shared between worker processes.
+
+The snapshot is written once to snapshot-<generation>.bin in a shared
+directory and every worker maps it read-only, so the column arrays and
+pre-encoded product bodies exist once in the page cache no matter how many
+workers attach. A small generation file names the current snapshot:
+
+- A worker that commits a product change bumps the generation. Bumps take
+  their own short file lock, so commits never wait for a snapshot build.
+- A worker that sees a generation without a snapshot file takes an
+  exclusive build lock and builds it; the other workers block on the same
+  lock and attach to the finished file instead of querying the database.
+- Snapshot files are written to a temporary name and renamed into place,
+  so readers never see a partial file. Workers still mapping an older
+  generation keep reading it safely until they switch.
+- Every PRODUCT_SNAPSHOT_FINGERPRINT_SECONDS a worker compares the
+  fingerprint stored in its snapshot with the database and publishes a new
+  generation if they differ, which picks up changes made outside the app
+  (for example a re-seed).
+
+POSIX only (uses fcntl file locks).
+"""
+
+import fcntl
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.catalog import catalog_fingerprint
+from app.core.snapshot import COLUMNS, CatalogSnapshot, load_products
+
+# magic, generation, product count, metadata length, body blob length
+HEADER = struct.Struct("<8sQQQQ")
+MAGIC = b"VGSNAP02"
+ALIGNMENT = 8
+
+
+def _padding(length: int) -> bytes:
+    return b"\0" * (-length % ALIGNMENT)
+
+
+def write_snapshot(path: str, snapshot: CatalogSnapshot, fingerprint: str) -> None:
+    """
+    Atomically write a snapshot file.
+
+    Args:
+        path: Destination path
+        snapshot: Snapshot to write
+        fingerprint: Catalog fingerprint at build time
+    """
+    metadata = json.dumps(
+        {"categories": snapshot.categories, "fingerprint": fingerprint}
+    ).encode("utf-8")
+    blob = bytes(snapshot.body_blob)
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, snapshot.version, len(snapshot.ids), len(metadata), len(blob)))
+        for name in COLUMNS:
+            data = snapshot.columns[name].tobytes()
+            f.write(data + _padding(len(data)))
+        f.write(metadata + _padding(len(metadata)))
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def map_snapshot(path: str) -> tuple[CatalogSnapshot, str]:
+    """
+    Map a snapshot file read-only without copying it.
+
+    Args:
+        path: Snapshot file path
+
+    Returns:
+        Tuple of (snapshot backed by the mapping, stored fingerprint)
+
+    Raises:
+        ValueError: If the file is not a snapshot
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, generation, count, metadata_length, blob_length = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a catalog snapshot")
+
+    offset = HEADER.size
+    columns = {}
+    for name, (dtype, extra) in COLUMNS.items():
+        length = count + extra
+        columns[name] = np.frombuffer(buffer, dtype=dtype, count=length, offset=offset)
+        offset += length * np.dtype(dtype).itemsize
+        offset += -offset % ALIGNMENT
+
+    metadata = json.loads(bytes(buffer[offset:offset + metadata_length]))
+    offset += metadata_length
+    offset += -offset % ALIGNMENT
+    blob = memoryview(buffer)[offset:offset + blob_length]
+
+    snapshot = CatalogSnapshot(generation, columns, metadata["categories"], blob)
+    return snapshot, metadata["fingerprint"]
+
+
+class SharedSnapshotStore:
+    """Generation-numbered snapshot files shared by all worker processes."""
+
+    def __init__(self, directory: str, fingerprint_seconds: float):
+        self.directory = directory
+        self.generation_path = os.path.join(directory, "generation")
+        self.lock_path = os.path.join(directory, "build.lock")
+        self.generation_lock_path = os.path.join(directory, "generation.lock")
+        self.fingerprint_seconds = fingerprint_seconds
+        os.makedirs(directory, exist_ok=True)
+
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._fingerprint: Optional[str] = None
+        self._fingerprint_checked_at = 0.0
+        self._generation_key = None
+        self._lock = threading.Lock()
+
+    def snapshot_path(self, generation: int) -> str:
+        """Return the file path of a generation's snapshot."""
+        return os.path.join(self.directory, f"snapshot-{generation}.bin")
+
+    @contextmanager
+    def _file_lock(self, path: Optional[str] = None):
+        """Hold a cross-process file lock (the build lock by default)."""
+        with open(path or self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _stat_generation(self):
+        try:
+            stat = os.stat(self.generation_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def current_generation(self) -> int:
+        """Return the current generation number (0 before the first change)."""
+        try:
+            with open(self.generation_path) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _write_generation(self, generation: int) -> None:
+        tmp_path = f"{self.generation_path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            f.write(str(generation))
+        os.replace(tmp_path, self.generation_path)
+
+    def bump_generation(self) -> int:
+        """
+        Mark the shared snapshot stale after a catalog change.
+
+        Doesn't wait for a build in progress: that build finishes the
+        generation it started and the next reader builds the new one.
+
+        Returns:
+            The new generation number
+        """
+        with self._file_lock(self.generation_lock_path):
+            generation = self.current_generation() + 1
+            self._write_generation(generation)
+        return generation
+
+    def _build(self, db: Session, generation: int) -> None:
+        """Build and publish a generation's snapshot (caller holds the build lock)."""
+        fingerprint = catalog_fingerprint(db)
+        snapshot = CatalogSnapshot.from_products(generation, load_products(db))
+        write_snapshot(self.snapshot_path(generation), snapshot, fingerprint)
+
+        # Older generations are unreachable; workers still mapping them keep
+        # their mapping after the file is unlinked
+        for path in glob.glob(os.path.join(self.directory, "snapshot-*.bin")):
+            if path != self.snapshot_path(generation):
+                os.remove(path)
+
+    def _attach(self, db: Session) -> tuple[CatalogSnapshot, str]:
+        """Map the current generation's snapshot, building it if nobody has."""
+        while True:
+            generation = self.current_generation()
+            path = self.snapshot_path(generation)
+            if not os.path.exists(path):
+                with self._file_lock():
+                    generation = self.current_generation()
+                    path = self.snapshot_path(generation)
+                    if not os.path.exists(path):
+                        self._build(db, generation)
+
+            try:
+                return map_snapshot(path)
+            except FileNotFoundError:
+                # Another worker published a newer generation and removed
+                # this one after we looked; attach to the current one
+                continue
+
+    def get(self, db: Session) -> CatalogSnapshot:
+        """
+        Return the snapshot for the current generation, attaching or building it.
+
+        Args:
+            db: Database session used if this process has to build
+
+        Returns:
+            Snapshot backed by the shared file
+        """
+        key = self._stat_generation()
+        snapshot = self._snapshot
+        fingerprint_due = time.monotonic() - self._fingerprint_checked_at >= self.fingerprint_seconds
+        if snapshot is not None and key == self._generation_key and not fingerprint_due:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != self.current_generation():
+                self._snapshot, self._fingerprint = self._attach(db)
+                # Check a newly attached generation right away
+                self._fingerprint_checked_at = 0.0
+
+            now = time.monotonic()
+            if now - self._fingerprint_checked_at >= self.fingerprint_seconds:
+                self._fingerprint_checked_at = now
+                if self._fingerprint != catalog_fingerprint(db):
+                    # Changed behind our back: publish a fresh generation
+                    self.bump_generation()
+                    self._snapshot, self._fingerprint = self._attach(db)
+                    key = self._stat_generation()
+
+            self._generation_key = key
+
+        return self._snapshot
@@ -0,0 +1,321 @@
+"""
+In-memory columnar snapshot of the product catalog.
+
+When PRODUCT_SNAPSHOT_ENABLED is set (and NumPy is installed), product
+listings that only filter on category/price and sort on price, name or
+created_at, as well as product detail reads, are answered from immutable
+column arrays with presorted index permutations and pre-encoded static
+product JSON instead of the database. Stock is merged in at response time
+(see app.core.product_cache), so purchases don't invalidate the snapshot.
+
+By default every worker process keeps its own snapshot, tied to the
+in-process static catalog version and rebuilt on the first read after a
+change. Changes made by other processes are caught by comparing a catalog
+fingerprint with the database at most once per
+PRODUCT_SNAPSHOT_FINGERPRINT_SECONDS.
+With PRODUCT_SNAPSHOT_SHARED_DIR set, one process builds the snapshot into
+a file that every worker maps read-only (see app.core.shared_snapshot).
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from math import ceil
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; reads fall back to the database
+    np = None
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.catalog import (
+    CatalogChange,
+    catalog_fingerprint,
+    get_static_catalog_version,
+    on_catalog_change,
+)
+from app.core.product_cache import CachedListing, encode_response, encode_static_product
+from app.models.product import Product
+from app.schemas.product import ProductListResponse, ProductResponse
+
+SNAPSHOT_SORT_FIELDS = ("price", "name", "created_at")
+
+# Column name -> (dtype, extra elements beyond one per product)
+COLUMNS = {
+    "ids": ("<i8", 0),
+    "price": ("<f8", 0),
+    "created_at": ("<i8", 0),
+    "category": ("<i4", 0),
+    "order_price": ("<i8", 0),
+    "order_created_at": ("<i8", 0),
+    "order_name": ("<i8", 0),
+    "body_offsets": ("<i8", 1),
+}
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class CatalogSnapshot:
+    """Immutable column arrays and pre-encoded product bodies for one catalog version."""
+
+    def __init__(
+        self,
+        version: int,
+        columns: dict,
+        categories: list[str],
+        body_blob,
+    ):
+        self.version = version
+        self.columns = columns
+        self.categories = categories
+        self.body_blob = body_blob
+
+        self.ids = columns["ids"]
+        self.price = columns["price"]
+        self.created_at = columns["created_at"]
+        self.category = columns["category"]
+        self.body_offsets = columns["body_offsets"]
+        self.order = {
+            "price": columns["order_price"],
+            "created_at": columns["order_created_at"],
+            "name": columns["order_name"],
+        }
+        self._category_codes = {name: code for code, name in enumerate(categories)}
+
+    @classmethod
+    def from_products(cls, version: int, products: list[Product]) -> "CatalogSnapshot":
+        """
+        Build a snapshot from products ordered by id.
+
+        Args:
+            version: Static catalog version (or shared generation) the rows were read at
+            products: Every product, ordered by id
+
+        Returns:
+            New snapshot
+        """
+        count = len(products)
+        categories = sorted({p.category for p in products})
+        category_codes = {name: code for code, name in enumerate(categories)}
+
+        bodies = [encode_static_product(ProductResponse.model_validate(p)) for p in products]
+        offsets = np.zeros(count + 1, dtype="<i8")
+        offsets[1:] = np.cumsum([len(body) for body in bodies])
+
+        ids = np.fromiter((p.id for p in products), dtype="<i8", count=count)
+        price = np.fromiter((p.price for p in products), dtype="<f8", count=count)
+        created_at = np.fromiter((_to_micros(p.created_at) for p in products), dtype="<i8", count=count)
+        names = [p.name for p in products]
+
+        columns = {
+            "ids": ids,
+            "price": price,
+            "created_at": created_at,
+            "category": np.fromiter((category_codes[p.category] for p in products), dtype="<i4", count=count),
+            # Ascending permutations per sort field, id as tie-breaker
+            "order_price": np.lexsort((ids, price)).astype("<i8"),
+            "order_created_at": np.lexsort((ids, created_at)).astype("<i8"),
+            "order_name": np.array(sorted(range(count), key=lambda i: (names[i], i)), dtype="<i8"),
+            "body_offsets": offsets,
+        }
+        for array in columns.values():
+            array.flags.writeable = False
+
+        return cls(version, columns, categories, b"".join(bodies))
+
+    def product_position(self, product_id: int) -> Optional[int]:
+        """Return the snapshot position of a product, or None if it doesn't exist."""
+        position = int(np.searchsorted(self.ids, product_id))
+        if position < len(self.ids) and self.ids[position] == product_id:
+            return position
+        return None
+
+    def product_body(self, position: int) -> bytes:
+        """Return the encoded static product body (no stock) at a position."""
+        return bytes(self.body_blob[self.body_offsets[position]:self.body_offsets[position + 1]])
+
+    def select(
+        self,
+        category: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        sort_by: str,
+        sort_order: str,
+    ) -> "np.ndarray":
+        """
+        Return snapshot positions matching the filters, in sort order.
+
+        Args:
+            category: Category filter
+            min_price: Minimum price filter
+            max_price: Maximum price filter
+            sort_by: Sort field (price, name, created_at)
+            sort_order: Sort order (asc, desc)
+
+        Returns:
+            Array of positions into the snapshot columns
+        """
+        mask = np.ones(len(self.ids), dtype=bool)
+        if category:
+            code = self._category_codes.get(category)
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= self.category == code
+        if min_price is not None:
+            mask &= self.price >= min_price
+        if max_price is not None:
+            mask &= self.price <= max_price
+
+        permutation = self.order[sort_by]
+        if sort_order != "asc":
+            permutation = permutation[::-1]
+        return permutation[mask[permutation]]
+
+    def list_products(
+        self,
+        *,
+        page: int,
+        page_size: int,
+        category: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        sort_by: str,
+        sort_order: str,
+        count: str,
+    ) -> CachedListing:
+        """
+        Answer a product listing from the snapshot.
+
+        Args:
+            page: Page number (1-indexed)
+            page_size: Number of items per page
+            category: Category filter
+            min_price: Minimum price filter
+            max_price: Maximum price filter
+            sort_by: Sort field (price, name, created_at)
+            sort_order: Sort order (asc, desc)
+            count: Total count mode; totals are exact unless this is none
+
+        Returns:
+            Listing awaiting the stock merge
+        """
+        positions = self.select(category, min_price, max_price, sort_by, sort_order)
+        offset = (page - 1) * page_size
+
+        total = total_pages = None
+        if count != "none":
+            total = len(positions)
+            total_pages = ceil(total / page_size) if total > 0 else 1
+
+        envelope = encode_response(ProductListResponse(
+            products=[],
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+        ))
+        products = tuple(
+            (int(self.ids[i]), self.product_body(i)) for i in positions[offset:offset + page_size]
+        )
+        return CachedListing(envelope, products)
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_snapshot_fingerprint: Optional[str] = None
+_fingerprint_checked_at = 0.0
+_snapshot_lock = threading.Lock()
+_shared_store = None
+
+
+def snapshot_enabled() -> bool:
+    """Return whether reads may be served from the snapshot."""
+    return settings.PRODUCT_SNAPSHOT_ENABLED and np is not None
+
+
+def load_products(db: Session) -> list[Product]:
+    """Load every product ordered by id for a snapshot build."""
+    return db.query(Product).order_by(Product.id).all()
+
+
+def _get_shared_store():
+    """Return the shared snapshot store, or None when snapshots are process-local."""
+    global _shared_store
+
+    if _shared_store is None and snapshot_enabled() and settings.PRODUCT_SNAPSHOT_SHARED_DIR:
+        from app.core.shared_snapshot import SharedSnapshotStore
+
+        with _snapshot_lock:
+            if _shared_store is None:
+                _shared_store = SharedSnapshotStore(
+                    settings.PRODUCT_SNAPSHOT_SHARED_DIR,
+                    fingerprint_seconds=settings.PRODUCT_SNAPSHOT_FINGERPRINT_SECONDS,
+                )
+
+    return _shared_store
+
+
+def get_snapshot(db: Session) -> CatalogSnapshot:
+    """
+    Return the current snapshot, rebuilding it if stale.
+
+    Only one thread rebuilds the process-local snapshot; concurrent callers
+    wait for it and share the result. The snapshot is also rebuilt when the
+    catalog fingerprint, checked at most once per
+    PRODUCT_SNAPSHOT_FINGERPRINT_SECONDS, shows a change made elsewhere.
+
+    Args:
+        db: Database session used to load the catalog
+
+    Returns:
+        Current catalog snapshot
+    """
+    global _snapshot, _snapshot_fingerprint, _fingerprint_checked_at
+
+    store = _get_shared_store()
+    if store is not None:
+        return store.get(db)
+
+    interval = settings.PRODUCT_SNAPSHOT_FINGERPRINT_SECONDS
+    snapshot = _snapshot
+    if (
+        snapshot is not None
+        and snapshot.version == get_static_catalog_version()
+        and time.monotonic() - _fingerprint_checked_at < interval
+    ):
+        return snapshot
+
+    with _snapshot_lock:
+        version = get_static_catalog_version()
+        snapshot = _snapshot
+        now = time.monotonic()
+        if snapshot is not None and snapshot.version == version and now - _fingerprint_checked_at >= interval:
+            _fingerprint_checked_at = now
+            if catalog_fingerprint(db) != _snapshot_fingerprint:
+                # Changed by another process: rebuild below
+                snapshot = None
+
+        if snapshot is None or snapshot.version != version:
+            fingerprint = catalog_fingerprint(db)
+            snapshot = CatalogSnapshot.from_products(version, load_products(db))
+            _snapshot = snapshot
+            _snapshot_fingerprint = fingerprint
+            _fingerprint_checked_at = now
+
+    return snapshot
+
+
+@on_catalog_change
+def _mark_shared_snapshot_stale(change: CatalogChange) -> None:
+    if change.volatile_only:
+        return
+    store = _get_shared_store()
+    if store is not None:
+        store.bump_generation()
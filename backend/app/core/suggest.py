@@ -0,0 +1,191 @@
+"""
+In-memory prefix index for search-as-you-type suggestions.
+
+Every word position of a product name (and each category name) is stored
+as a key in a sorted list, so "spin" finds "Rolling Hardside Spinner Large"
+through its "spinner large" key with one binary search. The index is built
+from the database once and then updated incrementally from catalog change
+events. Changes made by other processes are caught by a catalog fingerprint
+check at most once per PRODUCT_SEARCH_FINGERPRINT_SECONDS, which marks the
+index stale; otherwise suggestion lookups never touch the database.
+"""
+
+import bisect
+import threading
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.catalog import CatalogChange, FingerprintCheck, on_catalog_change
+from app.core.search import tokenize
+from app.models.product import Product, ProductCategory
+
+# Matches examined per lookup before ranking, bounds work for short prefixes
+MAX_CANDIDATES = 200
+
+
+def _keys(text: str) -> list[str]:
+    """Return one key per word position: "a b c" -> ["a b c", "b c", "c"]."""
+    words = tokenize(text)
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class SuggestIndex:
+    """Sorted prefix index over product and category names."""
+
+    def __init__(self):
+        # Sorted (key, word position, kind, value, product id) entries
+        self._entries: list[tuple[str, int, str, str, int]] = []
+        self._product_entries: dict[int, list[tuple]] = {}
+        self._lock = threading.Lock()
+        self._fingerprint = FingerprintCheck(settings.PRODUCT_SEARCH_FINGERPRINT_SECONDS)
+        self.stale = True
+
+    def check_fingerprint(self, db: Session) -> None:
+        """
+        Mark the index stale if the catalog changed in another process.
+
+        Args:
+            db: Database session
+        """
+        if self._fingerprint.changed(db):
+            self.stale = True
+
+    def rebuild(self, db: Session) -> None:
+        """
+        Rebuild the whole index from the database.
+
+        Args:
+            db: Database session
+        """
+        self._fingerprint.reset(db)
+        rows = db.query(Product.id, Product.name).all()
+
+        entries = []
+        product_entries = {}
+        for product_id, name in rows:
+            product_entries[product_id] = self._product_keys(product_id, name)
+            entries.extend(product_entries[product_id])
+        for category in ProductCategory:
+            entries.extend(self._category_keys(category.value))
+        entries.sort()
+
+        with self._lock:
+            self._entries = entries
+            self._product_entries = product_entries
+            self.stale = False
+
+    @staticmethod
+    def _product_keys(product_id: int, name: str) -> list[tuple]:
+        return [(key, position, "product", name, product_id) for position, key in enumerate(_keys(name))]
+
+    @staticmethod
+    def _category_keys(category: str) -> list[tuple]:
+        label = category.replace("_", " ")
+        return [(key, position, "category", category, 0) for position, key in enumerate(_keys(label))]
+
+    def _remove_product(self, product_id: int) -> None:
+        for entry in self._product_entries.pop(product_id, []):
+            index = bisect.bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                del self._entries[index]
+
+    def apply(self, change: CatalogChange) -> None:
+        """
+        Apply a committed catalog change.
+
+        Args:
+            change: Products changed by one transaction
+        """
+        if change.full:
+            self.stale = True
+            return
+
+        with self._lock:
+            for product_id in change.deleted:
+                self._remove_product(product_id)
+            for product_id, values in change.updated.items():
+                entries = self._product_entries.get(product_id)
+                if entries and entries[0][3] == values["name"]:
+                    continue  # name unchanged (e.g. stock update)
+                self._remove_product(product_id)
+                entries = self._product_keys(product_id, values["name"])
+                self._product_entries[product_id] = entries
+                for entry in entries:
+                    bisect.insort(self._entries, entry)
+
+    def suggest(self, query: str, limit: int = 10) -> list[dict]:
+        """
+        Return the best suggestions for a typed prefix.
+
+        Categories rank first, then names that start with the prefix, then
+        names with a later word starting with it; ties go to shorter names.
+
+        Args:
+            query: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of suggestion dicts
+        """
+        prefix = " ".join(tokenize(query))
+        if not prefix:
+            return []
+
+        with self._lock:
+            entries = self._entries
+            start = bisect.bisect_left(entries, (prefix,))
+            candidates = []
+            for entry in entries[start:start + MAX_CANDIDATES]:
+                if not entry[0].startswith(prefix):
+                    break
+                candidates.append(entry)
+
+        ranked = sorted(
+            candidates,
+            key=lambda entry: (entry[2] != "category", entry[1] > 0, len(entry[3]), entry[3]),
+        )
+
+        suggestions = []
+        seen = set()
+        for key, position, kind, value, product_id in ranked:
+            identity = (kind, product_id or value)
+            if identity in seen:
+                continue
+            seen.add(identity)
+            suggestions.append({
+                "text": value.replace("_", " ") if kind == "category" else value,
+                "type": kind,
+                "product_id": product_id or None,
+                "category": value if kind == "category" else None,
+            })
+            if len(suggestions) >= limit:
+                break
+
+        return suggestions
+
+
+suggest_index = SuggestIndex()
+
+
+@on_catalog_change
+def _update_suggest_index(change: CatalogChange) -> None:
+    suggest_index.apply(change)
+
+
+def init_suggest_index(db: Optional[Session] = None) -> None:
+    """
+    Build the suggestion index at startup.
+
+    Args:
+        db: Database session (a new one is opened if omitted)
+    """
+    from app.database import SessionLocal
+
+    session = db or SessionLocal()
+    try:
+        suggest_index.rebuild(session)
+    finally:
+        if db is None:
+            session.close()
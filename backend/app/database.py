@@ -37,4 +37,13 @@ def init_db():
     """Initialize database tables."""
     from app.models import user, product, cart, cart_item, saved_item, promo_code  # noqa: F401
 
+    from app.core.search import init_search_index
+
     Base.metadata.create_all(bind=engine)
+
+    # create_all skips existing tables, so add indexes declared after they were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    init_search_index(engine)
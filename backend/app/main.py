@@ -4,11 +4,17 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import auth, products, cart, shipping, promo_codes, orders
 from app.config import settings
+from app.core.ranked_search import init_ranked_index
+from app.core.suggest import init_suggest_index
 from app.database import init_db
 
 # Initialize database tables
 init_db()
 
+# Build in-memory search indexes
+init_suggest_index()
+init_ranked_index()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
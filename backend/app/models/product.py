@@ -2,7 +2,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text
 
 from app.database import Base
 
@@ -31,5 +31,17 @@ class Product(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    # Listing indexes: one per supported filter + sort combination, with id
+    # as the tie-breaker used by cursor pagination. Price-range filters use
+    # the price indexes.
+    __table_args__ = (
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_category_price_id", "category", "price", "id"),
+        Index("ix_products_category_name_id", "category", "name", "id"),
+        Index("ix_products_category_created_at_id", "category", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Product(id={self.id}, name='{self.name}', category='{self.category}', price={self.price})>"
@@ -1,8 +1,8 @@
 """Pydantic schemas for Cart models."""
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from app.schemas.product import ProductResponse
 
@@ -78,3 +78,39 @@ class GuestCartMerge(BaseModel):
     """Schema for merging guest cart with user cart."""
 
     items: list[GuestCartItem] = Field(..., description="Guest cart items to merge")
+
+
+# Fields each batch operation needs
+CART_OPERATION_FIELDS = {
+    "add": ("product_id", "quantity"),
+    "update": ("item_id", "quantity"),
+    "remove": ("item_id",),
+    "save": ("item_id",),
+    "restore": ("saved_id",),
+}
+
+
+class CartOperation(BaseModel):
+    """Schema for one operation in a batched cart update."""
+
+    op: Literal["add", "update", "remove", "save", "restore"] = Field(..., description="Operation")
+    product_id: Optional[int] = Field(None, gt=0, description="Product ID (add)")
+    item_id: Optional[int] = Field(None, gt=0, description="Cart item ID (update, remove, save)")
+    saved_id: Optional[int] = Field(None, gt=0, description="Saved item ID (restore)")
+    quantity: Optional[int] = Field(None, gt=0, description="Quantity to add or set (add, update)")
+
+    @model_validator(mode="after")
+    def check_required_fields(self):
+        """Require the fields the operation uses."""
+        missing = [name for name in CART_OPERATION_FIELDS[self.op] if getattr(self, name) is None]
+        if missing:
+            raise ValueError(f"'{self.op}' requires {', '.join(missing)}")
+        return self
+
+
+class CartBatchRequest(BaseModel):
+    """Schema for applying several cart operations in one request."""
+
+    operations: list[CartOperation] = Field(
+        ..., min_length=1, max_length=100, description="Operations, applied in order"
+    )
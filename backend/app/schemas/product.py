@@ -44,14 +44,95 @@ class ProductResponse(ProductBase):
         from_attributes = True
 
 
+class ProductStock(BaseModel):
+    """Volatile product fields, merged into cached static product bodies."""
+
+    stock: int
+    updated_at: datetime
+
+
 class ProductListResponse(BaseModel):
     """Schema for paginated product list response."""
 
     products: list[ProductResponse]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = Field(False, description="Whether total is a lower-bound estimate")
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (cursor mode only)")
 
     class Config:
         from_attributes = True
+
+
+class ProductFieldsResponse(BaseModel):
+    """Sparse product schema: only the requested fields are set and serialized."""
+
+    id: Optional[int] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    category: Optional[str] = None
+    image_url: Optional[str] = None
+    stock: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class ProductFieldsListResponse(ProductListResponse):
+    """Paginated product list with a sparse fieldset."""
+
+    products: list[ProductFieldsResponse]
+
+
+class ProductBatchRequest(BaseModel):
+    """Schema for fetching several products by id in one request."""
+
+    ids: list[int] = Field(..., min_length=1, max_length=100, description="Product IDs to fetch")
+
+
+class ProductBatchResponse(BaseModel):
+    """Schema for batch product lookup response."""
+
+    products: dict[int, ProductResponse] = Field(..., description="Found products keyed by id")
+    missing: list[int] = Field(..., description="Requested ids that don't exist")
+
+
+class CategoryFacet(BaseModel):
+    """Schema for a category facet count."""
+
+    category: str
+    count: int
+
+
+class PriceBucketFacet(BaseModel):
+    """Schema for a price range facet count."""
+
+    min_price: float
+    max_price: Optional[float] = Field(None, description="Exclusive upper bound (None for the last bucket)")
+    count: int
+
+
+class ProductFacetsResponse(BaseModel):
+    """Schema for category and price facet counts."""
+
+    categories: list[CategoryFacet]
+    price_buckets: list[PriceBucketFacet]
+    total: int = Field(..., description="Products matching all current filters")
+
+
+class ProductSuggestion(BaseModel):
+    """Schema for a single autocomplete suggestion."""
+
+    text: str
+    type: str = Field(..., description="product or category")
+    product_id: Optional[int] = None
+    category: Optional[str] = None
+
+
+class ProductSuggestResponse(BaseModel):
+    """Schema for autocomplete suggestions."""
+
+    query: str
+    suggestions: list[ProductSuggestion]
@@ -0,0 +1,98 @@
+"""Shared fixtures for backend tests."""
+import os
+import tempfile
+
+# Point the app at a throwaway database before any app module creates the
+# engine (TEST_DATABASE_URL runs the suite against another database instead)
+_db_dir = tempfile.mkdtemp(prefix="voyager-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", f"sqlite:///{_db_dir}/test.db")
+os.environ["DEBUG"] = "False"
+
+import pytest
+
+from app.core.security import hash_password
+from app.database import SessionLocal, engine, init_db
+from app.models.cart import Cart
+from app.models.cart_item import CartItem
+from app.models.product import Product
+from app.models.saved_item import SavedItem
+from app.models.user import User
+
+init_db()
+
+
+@pytest.fixture
+def db():
+    """Database session over empty cart, product and user tables."""
+    with engine.begin() as conn:
+        for model in (SavedItem, CartItem, Cart, Product, User):
+            conn.execute(model.__table__.delete())
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    """Factory creating users with unique usernames."""
+    def make(username: str) -> User:
+        user = User(
+            username=username,
+            email=f"{username}@example.com",
+            hashed_password=hash_password("TestPassw0rd!"),
+        )
+        db.add(user)
+        db.commit()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def make_product(db):
+    """Factory creating products with the given stock."""
+    def make(stock: int, name: str = "Test product") -> Product:
+        product = Product(
+            name=name,
+            description="Test description",
+            price=10.0,
+            category="bags",
+            image_url="https://example.com/product.jpg",
+            stock=stock,
+        )
+        db.add(product)
+        db.commit()
+        return product
+
+    return make
+
+
+@pytest.fixture
+def add_cart_line(db):
+    """Put a product into a user's cart directly, creating the cart if needed."""
+    def add(user: User, product: Product, quantity: int) -> None:
+        cart = db.query(Cart).filter(Cart.user_id == user.id).first()
+        if not cart:
+            cart = Cart(user_id=user.id)
+            db.add(cart)
+            db.flush()
+        db.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=quantity))
+        db.commit()
+
+    return add
+
+
+@pytest.fixture
+def cart_quantity(db):
+    """Read the stored quantity of a product in a user's cart (0 if absent)."""
+    def read(user: User, product: Product) -> int:
+        db.expire_all()
+        return db.query(CartItem.quantity)\
+            .join(Cart)\
+            .filter(Cart.user_id == user.id, CartItem.product_id == product.id)\
+            .scalar() or 0
+
+    return read
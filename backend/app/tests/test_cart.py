@@ -0,0 +1,261 @@
+"""Tests for cart routes: stock checks in SQL, batch updates and lazy cart creation."""
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+from app.api.deps import get_current_user
+from app.api.routes import cart as cart_routes
+from app.api.routes.cart import add_to_cart, batch_update_cart, load_cart, merge_guest_cart
+from app.core.exceptions import CartConflictError, OutOfStockError
+from app.database import SessionLocal, engine
+from app.main import app
+from app.models.cart import Cart
+from app.models.cart_item import CartItem
+from app.models.user import User
+from app.schemas.cart import CartBatchRequest, CartItemCreate, CartOperation, GuestCartItem, GuestCartMerge
+
+THREADS = 12
+ADDS_PER_THREAD = 4
+
+
+@pytest.fixture
+def other_cart(make_user, make_product, add_cart_line):
+    """Another user's cart holding a product with more stock than the ones under test."""
+    other = make_user("other_shopper")
+    add_cart_line(other, make_product(stock=45, name="Roomy product"), 40)
+    return other
+
+
+def test_add_to_cart_rejects_increment_past_stock(db, make_user, make_product, add_cart_line, cart_quantity, other_cart):
+    user = make_user("shopper")
+    product = make_product(stock=15)
+    add_cart_line(user, product, 15)
+
+    with pytest.raises(OutOfStockError):
+        add_to_cart(CartItemCreate(product_id=product.id, quantity=5), user, db)
+    db.rollback()
+
+    assert cart_quantity(user, product) == 15
+
+
+def test_add_to_cart_increments_within_stock(db, make_user, make_product, add_cart_line, cart_quantity, other_cart):
+    user = make_user("shopper")
+    product = make_product(stock=15)
+    add_cart_line(user, product, 10)
+
+    add_to_cart(CartItemCreate(product_id=product.id, quantity=5), user, db)
+
+    assert cart_quantity(user, product) == 15
+
+
+def test_concurrent_adds_stay_within_stock(make_user, make_product, cart_quantity, other_cart):
+    # Starts without a cart, so the first adds also race to create it
+    user = make_user("shopper")
+    product = make_product(stock=25)
+    user_id, product_id = user.id, product.id
+    assert THREADS * ADDS_PER_THREAD > product.stock
+
+    outcomes = Counter()
+    errors = []
+    lock = threading.Lock()
+    start = threading.Barrier(THREADS)
+
+    def worker():
+        session = SessionLocal()
+        try:
+            shopper = session.get(User, user_id)
+            # Return the connection to the pool while waiting for the others
+            session.rollback()
+            start.wait()
+            for _ in range(ADDS_PER_THREAD):
+                try:
+                    add_to_cart(CartItemCreate(product_id=product_id, quantity=1), shopper, session)
+                    outcome = "added"
+                except OutOfStockError:
+                    outcome = "out of stock"
+                except Exception as exc:
+                    outcome = "error"
+                    with lock:
+                        errors.append(repr(exc))
+                # A failed request's session is closed without committing
+                session.rollback()
+                with lock:
+                    outcomes[outcome] += 1
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    quantity = cart_quantity(user, product)
+    assert errors == []
+    assert quantity <= product.stock
+    assert quantity == outcomes["added"] == product.stock
+
+
+def test_merge_caps_lines_at_stock(db, make_user, make_product, add_cart_line, cart_quantity, other_cart):
+    user = make_user("shopper")
+    full = make_product(stock=15, name="Already at stock")
+    partial = make_product(stock=15, name="Below stock")
+    new = make_product(stock=3, name="Not in cart")
+    add_cart_line(user, full, 15)
+    add_cart_line(user, partial, 4)
+
+    merge_guest_cart(GuestCartMerge(items=[
+        GuestCartItem(product_id=full.id, quantity=10),
+        GuestCartItem(product_id=partial.id, quantity=5),
+        GuestCartItem(product_id=new.id, quantity=10),
+    ]), user, db)
+
+    assert cart_quantity(user, full) == 15
+    assert cart_quantity(user, partial) == 9
+    assert cart_quantity(user, new) == 3
+
+
+def cart_item_id(db, user: User, product) -> int:
+    return db.query(CartItem.id)\
+        .join(Cart)\
+        .filter(Cart.user_id == user.id, CartItem.product_id == product.id)\
+        .scalar()
+
+
+def test_batch_applies_nothing_if_a_later_operation_fails(db, make_user, make_product, add_cart_line, cart_quantity):
+    user = make_user("shopper")
+    in_cart = make_product(stock=15, name="In cart")
+    scarce = make_product(stock=2, name="Scarce")
+    add_cart_line(user, in_cart, 2)
+
+    with pytest.raises(OutOfStockError, match="Operation 2 \\(add\\)"):
+        batch_update_cart(CartBatchRequest(operations=[
+            CartOperation(op="update", item_id=cart_item_id(db, user, in_cart), quantity=5),
+            CartOperation(op="add", product_id=scarce.id, quantity=3),
+        ]), user, db)
+    db.rollback()
+
+    assert cart_quantity(user, in_cart) == 2
+    assert cart_quantity(user, scarce) == 0
+
+
+def test_batch_remove_then_readd_same_product(db, make_user, make_product, add_cart_line, cart_quantity):
+    user = make_user("shopper")
+    product = make_product(stock=15)
+    add_cart_line(user, product, 4)
+
+    batch_update_cart(CartBatchRequest(operations=[
+        CartOperation(op="remove", item_id=cart_item_id(db, user, product)),
+        CartOperation(op="add", product_id=product.id, quantity=1),
+    ]), user, db)
+
+    assert cart_quantity(user, product) == 1
+
+
+def test_batch_reads_new_products_with_one_query(db, make_user, make_product, add_cart_line, cart_quantity):
+    user = make_user("shopper")
+    in_cart = make_product(stock=15, name="In cart")
+    new = [make_product(stock=15, name=f"New {i}") for i in range(3)]
+    add_cart_line(user, in_cart, 1)
+    operations = [CartOperation(op="add", product_id=product.id, quantity=2) for product in [in_cart, *new]]
+    db.expire_all()
+
+    product_queries = []
+
+    def count_product_query(conn, cursor, statement, parameters, context, executemany):
+        if re.search(r"\bFROM products\b", statement):
+            product_queries.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_product_query)
+    try:
+        batch_update_cart(CartBatchRequest(operations=operations), user, db)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_product_query)
+
+    assert len(product_queries) == 1
+    assert cart_quantity(user, in_cart) == 3
+    assert [cart_quantity(user, product) for product in new] == [2, 2, 2]
+
+
+def test_batch_add_racing_another_request_is_a_conflict(db, make_user, make_product, add_cart_line, cart_quantity, monkeypatch):
+    user = make_user("shopper")
+    product = make_product(stock=15)
+    other = make_product(stock=15, name="Other")
+    add_cart_line(user, other, 1)
+    cart_id = db.query(Cart.id).filter(Cart.user_id == user.id).scalar()
+    product_id = product.id
+
+    def load_then_race(db, user):
+        cart = load_cart(db, user)
+        # A concurrent /items add commits the same product after the batch loaded the cart
+        with engine.begin() as conn:
+            conn.execute(insert(CartItem).values(
+                cart_id=cart_id, product_id=product_id, quantity=3,
+                created_at=datetime.utcnow(), updated_at=datetime.utcnow(),
+            ))
+        return cart
+
+    monkeypatch.setattr(cart_routes, "load_cart", load_then_race)
+    with pytest.raises(CartConflictError, match="Operation 1 \\(add\\)"):
+        batch_update_cart(CartBatchRequest(operations=[
+            CartOperation(op="add", product_id=product_id, quantity=2),
+        ]), user, db)
+
+    assert cart_quantity(user, product) == 3
+
+
+@pytest.fixture
+def client_for(db):
+    """Factory for a test client authenticated as the given user."""
+    def make(user: User) -> TestClient:
+        db.refresh(user)
+        db.expunge(user)
+        app.dependency_overrides[get_current_user] = lambda: user
+        return TestClient(app)
+
+    yield make
+    app.dependency_overrides.clear()
+
+
+def cart_count(db) -> int:
+    db.expire_all()
+    return db.query(Cart).count()
+
+
+def test_get_cart_without_cart_does_not_create_one(db, make_user, client_for):
+    user = make_user("shopper")
+
+    response = client_for(user).get("/api/cart")
+
+    assert response.status_code == 200
+    assert response.json()["id"] == 0
+    assert response.json()["items"] == []
+    assert cart_count(db) == 0
+
+
+def test_failed_first_add_leaves_no_cart(db, make_user, client_for):
+    user = make_user("shopper")
+
+    response = client_for(user).post("/api/cart/items", json={"product_id": 999999, "quantity": 1})
+
+    assert response.status_code == 400
+    assert cart_count(db) == 0
+
+
+def test_failed_first_batch_leaves_no_cart(db, make_user, make_product, client_for):
+    user = make_user("shopper")
+    product = make_product(stock=5)
+
+    response = client_for(user).post("/api/cart/batch", json={"operations": [
+        {"op": "add", "product_id": product.id, "quantity": 1},
+        {"op": "add", "product_id": 999999, "quantity": 1},
+    ]})
+
+    assert response.status_code == 400
+    assert "Operation 2" in response.json()["detail"]
+    assert cart_count(db) == 0
@@ -0,0 +1,24 @@
+"""Tests for the product change feed."""
+from app.core import catalog
+from app.core.catalog import CatalogChange, on_catalog_change
+from app.core.change_feed import change_events
+
+
+def test_update_of_expired_product_reports_price_and_stock_deltas(db, make_product):
+    product = make_product(stock=5)
+    changes: list[CatalogChange] = []
+    callback = on_catalog_change(changes.append)
+    try:
+        # The commit in make_product expired the instance, so the old values
+        # aren't loaded when they're overwritten
+        product.price = 12.5
+        product.stock = 3
+        db.commit()
+    finally:
+        catalog._listeners.remove(callback)
+
+    [event] = change_events(changes[-1])
+    assert event["changes"] == {
+        "price": {"old": 10.0, "new": 12.5},
+        "stock": {"old": 5, "new": 3},
+    }
@@ -0,0 +1,56 @@
+"""Tests for the catalog read caches."""
+import json
+import time
+
+from sqlalchemy import insert, update
+
+from app.api.routes.products import count_products
+from app.config import settings
+from app.core import cache
+from app.core.http_cache import body_etag
+from app.core.product_cache import CACHES, load_static_product, render_product
+from app.database import engine
+from app.models.product import Product
+
+
+def test_detail_etag_follows_served_body_after_external_change(db, make_product):
+    for cache in CACHES.values():
+        cache.clear()
+    product = make_product(stock=5)
+    product_id = product.id
+    static_body = load_static_product(db, product_id)
+    first_etag, first_body = render_product(db, product_id, static_body)
+
+    # Another process changes the price; this process's caches aren't told
+    with engine.begin() as conn:
+        conn.execute(update(Product).where(Product.id == product_id).values(price=99.0))
+    CACHES["stock"].clear()
+
+    # The cached static body is still served until it expires...
+    etag, body = render_product(db, product_id, static_body)
+    assert json.loads(body)["price"] == json.loads(first_body)["price"]
+    assert etag == body_etag(body)
+
+    # ...and the ETag changes once the new price is served
+    etag, body = render_product(db, product_id, load_static_product(db, product_id))
+    assert json.loads(body)["price"] == 99.0
+    assert etag != first_etag
+
+
+def test_cached_total_expires_after_external_insert(db, make_product, monkeypatch):
+    for lru in CACHES.values():
+        lru.clear()
+    make_product(stock=5)
+    filter_key = ("test-total",)
+    assert count_products(db.query(Product), filter_key, "exact") == (1, False)
+
+    # Another process adds a product; this process's caches aren't told
+    with engine.begin() as conn:
+        conn.execute(insert(Product).values(
+            name="External", description="d", price=1.0, category="bags", image_url="u", stock=1
+        ))
+    assert count_products(db.query(Product), filter_key, "exact") == (1, False)
+
+    later = time.monotonic() + settings.PRODUCT_CACHE_TTL_SECONDS + 1
+    monkeypatch.setattr(cache.time, "monotonic", lambda: later)
+    assert count_products(db.query(Product), filter_key, "exact") == (2, False)
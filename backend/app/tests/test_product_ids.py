@@ -0,0 +1,65 @@
+"""Tests for the in-memory product id set."""
+from sqlalchemy import insert
+
+from app.core import product_ids as product_ids_module
+from app.core.product_ids import TAIL_LAG_IDS, ProductIdSet
+from app.database import engine
+from app.models.product import Product
+
+
+class Clock:
+    """Manually advanced stand-in for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def insert_product(product_id: int) -> None:
+    """Commit a product from "another process" (no catalog change event)."""
+    with engine.begin() as conn:
+        conn.execute(insert(Product).values(
+            id=product_id, name="External", description="d", price=1.0,
+            category="bags", image_url="u", stock=1,
+        ))
+
+
+def test_ids_committed_out_of_order_are_found(db, make_product, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(product_ids_module.time, "monotonic", clock)
+    make_product(stock=1)
+    ids = ProductIdSet(max_size=1000, refresh_seconds=1, rebuild_seconds=300)
+    ids.rebuild(db)
+
+    # The higher id commits first and advances the highest id seen
+    insert_product(100)
+    clock.now += 2
+    assert ids.may_exist(db, 100)
+
+    # A lower id allocated earlier commits afterwards
+    insert_product(50)
+    clock.now += 2
+    assert ids.may_exist(db, 50)
+
+
+def test_full_rebuild_finds_ids_beyond_the_tail_window(db, make_product, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(product_ids_module.time, "monotonic", clock)
+    make_product(stock=1)
+    ids = ProductIdSet(max_size=1000, refresh_seconds=1, rebuild_seconds=300)
+    ids.rebuild(db)
+
+    far_id = 10 * TAIL_LAG_IDS
+    insert_product(far_id)
+    clock.now += 2
+    assert ids.may_exist(db, far_id)
+
+    late_id = far_id - 2 * TAIL_LAG_IDS
+    insert_product(late_id)
+    clock.now += 2
+    assert not ids.may_exist(db, late_id)
+
+    clock.now += 300
+    assert ids.may_exist(db, late_id)
@@ -0,0 +1,132 @@
+"""
+Query-plan regression tests for product listing queries.
+
+Runs every filter/sort/pagination variant of GET /api/products through
+query_products, captures the SQL it issues and checks its plan (EXPLAIN
+QUERY PLAN on SQLite, EXPLAIN on PostgreSQL; point TEST_DATABASE_URL at a
+PostgreSQL database to check that). A statement fails if it reads the
+products table with a full scan or sorts instead of walking an index, or if
+it counts a filtered listing by walking a whole index instead of seeking
+the filtered range.
+
+Full-text search variants are not checked: relevance order always needs a
+sort.
+"""
+import itertools
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.api.routes.products import query_products
+from app.core.product_cache import count_cache
+from app.database import engine
+
+CATEGORIES = [None, "bags"]
+PRICE_RANGES = [(None, None), (50.0, None), (50.0, 200.0)]
+SORT_FIELDS = ["price", "name", "created_at"]
+SORT_ORDERS = ["asc", "desc"]
+CURSORS = [None, ""]  # offset pagination, first keyset page
+
+# SQLite plan lines that mean the products table isn't read through an index
+SQLITE_BAD_PLAN = re.compile(r"^SCAN (TABLE )?products$|USE TEMP B-TREE")
+# SQLite plan lines that walk a whole index. Page queries do this on purpose
+# and stop at the page limit; a count has no limit and reads every entry.
+SQLITE_UNBOUNDED_INDEX_SCAN = re.compile(r"^SCAN (TABLE )?products USING (COVERING )?INDEX")
+
+# PostgreSQL plan nodes
+POSTGRES_BAD_PLAN = re.compile(r"Seq Scan on products|(^|->\s+)Sort\b")
+POSTGRES_INDEX_SCAN = re.compile(r"(^|->\s+)Index (Only )?Scan( Backward)? using \w+ on products\b")
+
+
+@contextmanager
+def capture_statements():
+    """Collect (statement, parameters) for queries against the products table."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if re.search(r"\bFROM products\b", statement):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def degraded_plan_lines(statement: str, parameters, filtered: bool) -> list[str]:
+    """
+    Return the plan lines that indicate a full scan, sort or unbounded
+    index walk.
+
+    Args:
+        statement: SQL as sent to the driver
+        parameters: Driver parameters for the statement
+        filtered: Whether the listing has a category or price filter
+
+    Returns:
+        Offending plan lines (empty if the plan is fine)
+    """
+    # Counting an unfiltered listing has to read every row whichever index it uses
+    check_index_scan = filtered and re.match(r"SELECT count\(", statement)
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            return [
+                row[-1] for row in rows
+                if SQLITE_BAD_PLAN.search(row[-1])
+                or (check_index_scan and SQLITE_UNBOUNDED_INDEX_SCAN.search(row[-1]))
+            ]
+
+        # Make the planner avoid scans/sorts whenever an index can serve the
+        # query, so small test tables don't produce false failures
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        conn.exec_driver_sql("SET LOCAL enable_sort = off")
+        lines = [row[0].strip() for row in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+
+    problems = [line for line in lines if POSTGRES_BAD_PLAN.search(line)]
+    if check_index_scan:
+        # An index scan node without an Index Cond reads the whole index
+        for index, line in enumerate(lines):
+            if not POSTGRES_INDEX_SCAN.search(line):
+                continue
+            details = itertools.takewhile(lambda detail: not detail.startswith("->"), lines[index + 1:])
+            if not any(detail.startswith("Index Cond:") for detail in details):
+                problems.append(line)
+    return problems
+
+
+@pytest.mark.parametrize(
+    "category,price_range,sort_by,sort_order,cursor",
+    itertools.product(CATEGORIES, PRICE_RANGES, SORT_FIELDS, SORT_ORDERS, CURSORS),
+)
+def test_listing_queries_use_indexes(db, category, price_range, sort_by, sort_order, cursor):
+    min_price, max_price = price_range
+    # Make sure the count query runs too
+    count_cache.clear()
+    with capture_statements() as statements:
+        query_products(
+            db,
+            version=-1,
+            page=2,
+            page_size=12,
+            category=category,
+            search=None,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            min_price=min_price,
+            max_price=max_price,
+            cursor=cursor,
+            count="exact",
+        )
+
+    assert statements
+    filtered = category is not None or min_price is not None
+    problems = {
+        " ".join(statement.split()): lines
+        for statement, parameters in statements
+        if (lines := degraded_plan_lines(statement, parameters, filtered))
+    }
+    assert not problems
@@ -0,0 +1,58 @@
+"""Tests for the ranked product search index."""
+import time
+
+from sqlalchemy import delete, insert, update
+
+from app.config import settings
+from app.core import catalog
+from app.core.catalog import CatalogChange
+from app.core.ranked_search import RankedSearchIndex
+from app.database import engine
+from app.models.product import Product
+
+
+def product_values(name: str, stock: int) -> dict:
+    return {
+        "id": 1, "name": name, "description": "Carry-on", "category": "bags",
+        "price": 10.0, "stock": stock, "updated_at": None,
+    }
+
+
+def test_stock_only_change_does_not_reindex_product():
+    index = RankedSearchIndex()
+    index.apply(CatalogChange(updated={1: product_values("Backpack", 5)}, created={1}))
+    terms = index._doc_terms[1]
+
+    # A purchase: stock moved, nothing indexed changed
+    index.apply(CatalogChange(updated={1: product_values("Backpack", 4)}))
+    assert index._doc_terms[1] is terms
+
+    index.apply(CatalogChange(updated={1: product_values("Duffel", 4)}, static_changed={1}))
+    assert "duffel" in index._doc_terms[1]
+    assert "backpack" not in index._doc_terms[1]
+
+
+def test_out_of_process_changes_are_searchable_after_fingerprint_interval(db, make_product, monkeypatch):
+    kept_id = make_product(stock=5, name="Rolling Backpack").id
+    removed_id = make_product(stock=5, name="Hiking Backpack").id
+    index = RankedSearchIndex()
+    index.rebuild(db)
+
+    # Another process adds, reprices and deletes products
+    with engine.begin() as conn:
+        conn.execute(insert(Product).values(
+            name="Laptop Backpack", description="d", price=1.0, category="bags", image_url="u", stock=1
+        ))
+        conn.execute(update(Product).where(Product.id == kept_id).values(price=80.0))
+        conn.execute(delete(Product).where(Product.id == removed_id))
+
+    later = time.monotonic() + settings.PRODUCT_SEARCH_FINGERPRINT_SECONDS + 1
+    monkeypatch.setattr(catalog.time, "monotonic", lambda: later)
+    index.check_fingerprint(db)
+    assert index.stale
+    index.rebuild(db)
+
+    ids, total = index.search("backpack", offset=0, limit=10)
+    assert total == 2
+    assert removed_id not in ids
+    assert index.search("backpack", offset=0, limit=10, min_price=50.0) == ([kept_id], 1)
@@ -0,0 +1,88 @@
+"""Tests for the catalog snapshot shared between worker processes."""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, update
+
+pytest.importorskip("numpy")
+
+from app.core import shared_snapshot
+from app.core.shared_snapshot import SharedSnapshotStore
+from app.database import engine
+from app.models.product import Product
+
+
+def test_out_of_band_change_is_picked_up_after_fingerprint_interval(db, make_product, tmp_path, monkeypatch):
+    make_product(stock=5)
+    store = SharedSnapshotStore(str(tmp_path), fingerprint_seconds=60)
+    first = store.get(db)
+    assert len(first.ids) == 1
+
+    # A re-seed writes straight to the database without bumping the generation
+    with engine.begin() as conn:
+        conn.execute(insert(Product).values(
+            name="Seeded", description="d", price=1.0, category="bags", image_url="u", stock=1
+        ))
+    assert store.get(db) is first
+
+    later = time.monotonic() + 61
+    monkeypatch.setattr(shared_snapshot.time, "monotonic", lambda: later)
+    snapshot = store.get(db)
+    assert len(snapshot.ids) == 2
+    assert snapshot.version == first.version + 1
+
+
+def test_attach_retries_when_generation_file_is_removed(db, make_product, tmp_path, monkeypatch):
+    make_product(stock=5)
+    worker = SharedSnapshotStore(str(tmp_path), fingerprint_seconds=60)
+    other_worker = SharedSnapshotStore(str(tmp_path), fingerprint_seconds=60)
+    other_worker.get(db)
+    other_worker.bump_generation()
+
+    map_snapshot = shared_snapshot.map_snapshot
+    raced = []
+
+    def map_after_other_worker_builds(path):
+        # The other worker publishes the next generation between our
+        # exists() check and the open(), removing the file we were about to map
+        if not raced:
+            raced.append(path)
+            other_worker.bump_generation()
+            other_worker.get(db)
+        return map_snapshot(path)
+
+    monkeypatch.setattr(shared_snapshot, "map_snapshot", map_after_other_worker_builds)
+    snapshot = worker.get(db)
+    assert raced
+    assert snapshot.version == worker.current_generation()
+
+
+def test_stock_only_change_does_not_republish(db, make_product, tmp_path, monkeypatch):
+    product = make_product(stock=5)
+    store = SharedSnapshotStore(str(tmp_path), fingerprint_seconds=60)
+    first = store.get(db)
+
+    # A purchase in another process moves stock and updated_at only
+    with engine.begin() as conn:
+        conn.execute(update(Product).where(Product.id == product.id).values(
+            stock=4, updated_at=datetime.utcnow() + timedelta(seconds=1)
+        ))
+
+    later = time.monotonic() + 61
+    monkeypatch.setattr(shared_snapshot.time, "monotonic", lambda: later)
+    assert store.get(db) is first
+    assert store.current_generation() == first.version
+
+
+def test_bump_does_not_wait_for_a_build(tmp_path):
+    store = SharedSnapshotStore(str(tmp_path), fingerprint_seconds=60)
+    builder = SharedSnapshotStore(str(tmp_path), fingerprint_seconds=60)
+
+    with builder._file_lock():
+        bump = threading.Thread(target=store.bump_generation)
+        bump.start()
+        bump.join(timeout=5)
+        assert not bump.is_alive()
+    assert store.current_generation() == 1
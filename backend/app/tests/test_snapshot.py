@@ -0,0 +1,50 @@
+"""Tests for the process-local catalog snapshot."""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, update
+
+pytest.importorskip("numpy")
+
+from app.config import settings
+from app.core import snapshot as snapshot_module
+from app.core.snapshot import get_snapshot
+from app.database import engine
+from app.models.product import Product
+
+
+def test_out_of_process_change_is_picked_up_after_fingerprint_interval(db, make_product, monkeypatch):
+    monkeypatch.setattr(snapshot_module, "_snapshot", None)
+    make_product(stock=5)
+    first = get_snapshot(db)
+    assert len(first.ids) == 1
+
+    # Another process adds a product; this process's static version doesn't move
+    with engine.begin() as conn:
+        conn.execute(insert(Product).values(
+            name="External", description="d", price=1.0, category="bags", image_url="u", stock=1
+        ))
+    assert get_snapshot(db) is first
+
+    later = time.monotonic() + settings.PRODUCT_SNAPSHOT_FINGERPRINT_SECONDS + 1
+    monkeypatch.setattr(snapshot_module.time, "monotonic", lambda: later)
+    assert len(get_snapshot(db).ids) == 2
+
+
+def test_stock_only_commit_does_not_rebuild(db, make_product, monkeypatch):
+    monkeypatch.setattr(snapshot_module, "_snapshot", None)
+    product = make_product(stock=5)
+    first = get_snapshot(db)
+
+    # A purchase here and one in another process: stock and updated_at move
+    product.stock = 4
+    db.commit()
+    with engine.begin() as conn:
+        conn.execute(update(Product).where(Product.id == product.id).values(
+            stock=3, updated_at=datetime.utcnow() + timedelta(seconds=1)
+        ))
+
+    later = time.monotonic() + settings.PRODUCT_SNAPSHOT_FINGERPRINT_SECONDS + 1
+    monkeypatch.setattr(snapshot_module.time, "monotonic", lambda: later)
+    assert get_snapshot(db) is first
@@ -0,0 +1,31 @@
+"""Tests for the search-as-you-type suggestion index."""
+import time
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.core import catalog
+from app.core.suggest import SuggestIndex
+from app.database import engine
+from app.models.product import Product
+
+
+def test_out_of_process_insert_is_suggested_after_fingerprint_interval(db, make_product, monkeypatch):
+    make_product(stock=5, name="Backpack")
+    index = SuggestIndex()
+    index.rebuild(db)
+
+    # Another process adds a product; this process's change events miss it
+    with engine.begin() as conn:
+        conn.execute(insert(Product).values(
+            name="Barrel Duffel", description="d", price=1.0, category="bags", image_url="u", stock=1
+        ))
+    index.check_fingerprint(db)
+    assert not index.stale
+
+    later = time.monotonic() + settings.PRODUCT_SEARCH_FINGERPRINT_SECONDS + 1
+    monkeypatch.setattr(catalog.time, "monotonic", lambda: later)
+    index.check_fingerprint(db)
+    assert index.stale
+    index.rebuild(db)
+    assert "Barrel Duffel" in [suggestion["text"] for suggestion in index.suggest("ba")]
@@ -0,0 +1,105 @@
+"""
+Benchmark login-time guest cart merges.
+
+Merges guest carts of increasing size into a cart that already holds half
+of the same products, and prints the mean latency and the number of SQL
+statements per merge. Both should stay flat as the guest cart grows.
+
+Usage:
+    python scripts/bench_cart_merge.py
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+
+from app.api.routes.cart import merge_guest_cart
+from app.core.security import hash_password
+from app.database import SessionLocal, engine, init_db
+from app.models.cart import Cart
+from app.models.cart_item import CartItem
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.cart import GuestCartItem, GuestCartMerge
+
+GUEST_CART_SIZES = [1, 10, 30, 100]
+REPEATS = 20
+BENCH_USERNAME = "bench_cart_merge"
+
+
+def get_bench_user(db) -> User:
+    """Return the benchmark user, creating it on first run."""
+    user = db.query(User).filter(User.username == BENCH_USERNAME).first()
+    if not user:
+        user = User(
+            username=BENCH_USERNAME,
+            email=f"{BENCH_USERNAME}@example.com",
+            hashed_password=hash_password("BenchPassw0rd!"),
+        )
+        db.add(user)
+        db.commit()
+    return user
+
+
+def reset_cart(db, user: User, product_ids: list[int]) -> None:
+    """Leave the user's cart holding one unit of each given product."""
+    cart = db.query(Cart).filter(Cart.user_id == user.id).first()
+    if not cart:
+        cart = Cart(user_id=user.id)
+        db.add(cart)
+        db.flush()
+    db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
+    db.add_all(CartItem(cart_id=cart.id, product_id=product_id, quantity=1) for product_id in product_ids)
+    db.commit()
+    db.expunge_all()
+
+
+def main():
+    """Time merges of growing guest carts."""
+    init_db()
+    db = SessionLocal()
+    # As the cart routes' keep_loaded_state dependency does for each request
+    db.expire_on_commit = False
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    try:
+        user_id = get_bench_user(db).id
+        product_ids = [
+            product_id for (product_id,) in
+            db.query(Product.id).filter(Product.stock > 0).order_by(Product.id).limit(max(GUEST_CART_SIZES))
+        ]
+        if len(product_ids) < max(GUEST_CART_SIZES):
+            print(f"Need {max(GUEST_CART_SIZES)} products in stock - run scripts/seed_products.py first")
+            return
+
+        print(f"{'guest items':>12} {'ms/merge':>10} {'statements':>11}")
+        for size in GUEST_CART_SIZES:
+            guest_cart = GuestCartMerge(items=[
+                GuestCartItem(product_id=product_id, quantity=2) for product_id in product_ids[:size]
+            ])
+            elapsed = 0.0
+            for _ in range(REPEATS):
+                reset_cart(db, db.get(User, user_id), product_ids[:size:2])
+                user = db.get(User, user_id)
+
+                statements.clear()
+                event.listen(engine, "before_cursor_execute", count_statement)
+                start = time.perf_counter()
+                merge_guest_cart(guest_cart, user, db)
+                elapsed += time.perf_counter() - start
+                event.remove(engine, "before_cursor_execute", count_statement)
+
+            print(f"{size:>12} {elapsed / REPEATS * 1000:>10.2f} {len(statements):>11}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark per-request serialization cost of product reads."""
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.product_cache import (
+    detail_cache,
+    encode_listing,
+    encode_static_product,
+    listing_cache,
+    load_static_product,
+    render_listing,
+    render_product,
+)
+from app.database import SessionLocal, init_db
+from app.models.product import Product
+from app.schemas.product import ProductListResponse, ProductResponse
+
+ITERATIONS = 2000
+
+
+def bench(label: str, func, iterations: int = ITERATIONS):
+    """Run func repeatedly and print the mean time per call."""
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<45} {elapsed / iterations * 1e6:10.1f} us/request")
+
+
+def main():
+    """Compare the uncached serialization path with pre-encoded bodies."""
+    init_db()
+    db = SessionLocal()
+    try:
+        products = db.query(Product).order_by(Product.created_at.desc()).limit(12).all()
+        if not products:
+            print("No products found - run scripts/seed_products.py first")
+            return
+        product = products[0]
+
+        def detail_uncached():
+            model = ProductResponse.model_validate(product)
+            return json.dumps(jsonable_encoder(model)).encode("utf-8")
+
+        def listing_uncached():
+            model = ProductListResponse(
+                products=products, total=120, page=1, page_size=12, total_pages=10
+            )
+            return json.dumps(jsonable_encoder(model)).encode("utf-8")
+
+        detail_cache.set("bench", encode_static_product(ProductResponse.model_validate(product)))
+        listing_cache.set("bench", encode_listing(ProductListResponse(
+            products=products, total=120, page=1, page_size=12, total_pages=10
+        )))
+
+        print("Product detail:")
+        bench("validate + jsonable_encoder + json.dumps", detail_uncached)
+        bench("pre-encoded body (cache hit)", lambda: detail_cache.get("bench"))
+        bench("cache hit + stock merge", lambda: render_product(db, product.id, detail_cache.get("bench")))
+
+        def detail_orm_miss():
+            loaded = db.query(Product).filter(Product.id == product.id).first()
+            body = encode_static_product(ProductResponse.model_validate(loaded))
+            db.expunge_all()  # a fresh request session starts with an empty identity map
+            return body
+
+        print("Product detail cache miss (query + encode):")
+        bench("ORM query + model_validate", detail_orm_miss)
+        bench("Core select + TypeAdapter", lambda: load_static_product(db, product.id))
+
+        print("Product listing (12 items):")
+        bench("validate + jsonable_encoder + json.dumps", listing_uncached)
+        bench("pre-encoded body (cache hit)", lambda: listing_cache.get("bench"))
+        bench("cache hit + stock merge", lambda: render_listing(db, listing_cache.get("bench")))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
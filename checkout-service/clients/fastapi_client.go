@@ -43,6 +43,33 @@ func (c *FastAPIClient) GetProduct(productID int) (*models.Product, error) {
 	return &product, nil
 }
 
+func (c *FastAPIClient) GetProducts(productIDs []int) (*models.ProductBatchResponse, error) {
+	url := fmt.Sprintf("%s/api/products/batch", c.baseURL)
+
+	jsonData, err := json.Marshal(models.ProductBatchRequest{IDs: productIDs})
+	if err != nil {
+		return nil, fmt.Errorf("failed to marshal product ids: %w", err)
+	}
+
+	resp, err := c.client.Post(url, "application/json", bytes.NewBuffer(jsonData))
+	if err != nil {
+		return nil, fmt.Errorf("failed to get products: %w", err)
+	}
+	defer resp.Body.Close()
+
+	if resp.StatusCode != http.StatusOK {
+		body, _ := io.ReadAll(resp.Body)
+		return nil, fmt.Errorf("failed to get products: status %d, body: %s", resp.StatusCode, string(body))
+	}
+
+	var batch models.ProductBatchResponse
+	if err := json.NewDecoder(resp.Body).Decode(&batch); err != nil {
+		return nil, fmt.Errorf("failed to decode products: %w", err)
+	}
+
+	return &batch, nil
+}
+
 func (c *FastAPIClient) CreateOrder(orderReq models.OrderCreateRequest, token string) (*models.OrderResponse, error) {
 	url := fmt.Sprintf("%s/api/orders", c.baseURL)
 
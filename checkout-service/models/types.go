@@ -53,6 +53,15 @@ type Product struct {
 	Stock int     `json:"stock"`
 }
 
+type ProductBatchRequest struct {
+	IDs []int `json:"ids"`
+}
+
+type ProductBatchResponse struct {
+	Products map[int]Product `json:"products"`
+	Missing  []int           `json:"missing"`
+}
+
 type OrderItemCreate struct {
 	ProductID    int     `json:"product_id"`
 	ProductName  string  `json:"product_name"`
@@ -4,9 +4,11 @@ import (
 	"checkout-service/clients"
 	"checkout-service/models"
 	"fmt"
-	"time"
 )
 
+// Upper bound on ids per batch request, matching the API limit
+const maxBatchProductIDs = 100
+
 type InventoryChecker struct {
 	fapiClient *clients.FastAPIClient
 }
@@ -18,20 +20,38 @@ func NewInventoryChecker(fapiClient *clients.FastAPIClient) *InventoryChecker {
 }
 
 func (ic *InventoryChecker) ValidateStock(items []models.CartItem) error {
-	for _, item := range items {
-		product, err := ic.fapiClient.GetProduct(item.ProductID)
+	products := make(map[int]models.Product, len(items))
+
+	for start := 0; start < len(items); start += maxBatchProductIDs {
+		end := min(start+maxBatchProductIDs, len(items))
+
+		ids := make([]int, 0, end-start)
+		for _, item := range items[start:end] {
+			ids = append(ids, item.ProductID)
+		}
+
+		batch, err := ic.fapiClient.GetProducts(ids)
 		if err != nil {
-			return fmt.Errorf("failed to get product %d: %w", item.ProductID, err)
+			return fmt.Errorf("failed to get products: %w", err)
+		}
+		if len(batch.Missing) > 0 {
+			return fmt.Errorf("failed to get product %d: not found", batch.Missing[0])
 		}
 
+		for id, product := range batch.Products {
+			products[id] = product
+		}
+	}
+
+	for _, item := range items {
+		product := products[item.ProductID]
+
 		if product.Stock < item.Quantity {
 			return fmt.Errorf(
 				"insufficient stock for %s: requested %d, available %d",
 				product.Name, item.Quantity, product.Stock,
 			)
 		}
-
-		time.Sleep(20 * time.Millisecond)
 	}
 
 	return nil
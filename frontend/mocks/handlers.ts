@@ -242,6 +242,7 @@ export const handlers = [
     return HttpResponse.json({
       products: paginatedProducts,
       total,
+      total_is_estimate: false,
       page,
       page_size: pageSize,
       total_pages: totalPages,
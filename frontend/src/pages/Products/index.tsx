@@ -86,6 +86,8 @@ const Products: React.FC = () => {
     { value: 'name-desc', label: 'Name: Z to A' },
   ]
 
+  const totalPages = data?.total_pages ?? 1
+
   return (
     <div className="min-h-screen bg-gray-50">
       {/* Header */}
@@ -171,7 +173,8 @@ const Products: React.FC = () => {
         {/* Results Info */}
         {data && !isLoading && (
           <div className="mb-4 text-sm text-gray-600">
-            Showing {data.products.length} of {data.total} products
+            Showing {data.products.length}
+            {data.total !== null && ` of ${data.total}${data.total_is_estimate ? '+' : ''}`} products
             {filters.category && (
               <span className="ml-2 text-blue-600 font-medium">
                 in {categories.find((c) => c.value === filters.category)?.label}
@@ -184,7 +187,7 @@ const Products: React.FC = () => {
         <ProductList products={data?.products || []} isLoading={isLoading} />
 
         {/* Pagination */}
-        {data && data.total_pages > 1 && (
+        {data && totalPages > 1 && (
           <div className="mt-8 flex justify-center items-center gap-2">
             <button
               onClick={() => handlePageChange(data.page - 1)}
@@ -195,12 +198,12 @@ const Products: React.FC = () => {
             </button>
 
             <div className="flex gap-1">
-              {Array.from({ length: data.total_pages }, (_, i) => i + 1)
+              {Array.from({ length: totalPages }, (_, i) => i + 1)
                 .filter((page) => {
                   // Show first page, last page, current page, and pages around current
                   return (
                     page === 1 ||
-                    page === data.total_pages ||
+                    page === totalPages ||
                     Math.abs(page - data.page) <= 1
                   )
                 })
@@ -231,7 +234,7 @@ const Products: React.FC = () => {
 
             <button
               onClick={() => handlePageChange(data.page + 1)}
-              disabled={data.page === data.total_pages}
+              disabled={data.page === totalPages}
               className="px-4 py-2 border border-gray-300 rounded-md text-sm font-medium text-gray-700 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
             >
               Next
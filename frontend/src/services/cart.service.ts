@@ -7,6 +7,8 @@ import type {
   AddToCartRequest,
   UpdateCartItemRequest,
   GuestCartMergeRequest,
+  CartOperation,
+  CartBatchRequest,
   PromoCode,
   ShippingTaxInfo,
   ValidatePromoCodeRequest,
@@ -58,6 +60,15 @@ export const cartService = {
     return apiClient.post<Cart>('/api/cart/merge', data, { requiresAuth: true })
   },
 
+  /**
+   * Apply several cart operations in one request and transaction
+   * Requires authentication
+   */
+  async batchUpdateCart(operations: CartOperation[]): Promise<Cart> {
+    const data: CartBatchRequest = { operations }
+    return apiClient.post<Cart>('/api/cart/batch', data, { requiresAuth: true })
+  },
+
   /**
    * Clear entire cart
    * Requires authentication
@@ -112,6 +112,17 @@ export interface GuestCartMergeRequest {
   items: GuestCartItem[]
 }
 
+export type CartOperation =
+  | { op: 'add'; product_id: number; quantity: number }
+  | { op: 'update'; item_id: number; quantity: number }
+  | { op: 'remove'; item_id: number }
+  | { op: 'save'; item_id: number }
+  | { op: 'restore'; saved_id: number }
+
+export interface CartBatchRequest {
+  operations: CartOperation[]
+}
+
 export interface ValidatePromoCodeRequest {
   code: string
 }
@@ -23,10 +23,14 @@ export interface Product {
 
 export interface ProductListResponse {
   products: Product[]
-  total: number
+  // null with count=none and in cursor mode
+  total: number | null
+  // total is a lower bound (count=estimate)
+  total_is_estimate: boolean
   page: number
   page_size: number
-  total_pages: number
+  total_pages: number | null
+  next_cursor?: string | null
 }
 
 export interface ProductFilters {